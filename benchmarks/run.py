@@ -0,0 +1,241 @@
+"""Замеры времени ответа и числа запросов для всех адресов blog/urls.py.
+
+Перед запуском база заполняется командой generate_blog_data:
+
+    python blogicum/manage.py migrate
+    python blogicum/manage.py generate_blog_data --posts 100000 --seed 1
+    python benchmarks/run.py --repeat 30 --json results.json
+
+Сравнение с результатами другого коммита:
+
+    python benchmarks/run.py --compare results.json
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / 'blogicum'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.cache import caches  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Count  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from blog.models import Category, Comment, Post  # noqa: E402
+from blog.paginators import CursorPaginator  # noqa: E402
+from blogicum.constants import POSTS_AMOUNT  # noqa: E402
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(share * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def deep_cursor(queryset, pages):
+    # Курсор страницы, до которой по offset пришлось бы пролистать pages.
+    offset = max(pages - 1, 0) * POSTS_AMOUNT
+    post = queryset.order_by('-pub_date', '-pk')[offset:offset + 1].first()
+    if post is None:
+        return None
+    return CursorPaginator(queryset, POSTS_AMOUNT).encode_cursor(
+        post, 'next'
+    )
+
+
+def build_cases(depth):
+    """Список (название, адрес, клиент) по всем адресам блога."""
+    published = Post.objects.published()
+    post = published.order_by('-comment_count').first()
+    if post is None:
+        sys.exit('Нет опубликованных записей: запустите generate_blog_data.')
+    comment = Comment.objects.filter(post=post).first()
+    author = post.author
+    category = Category.objects.filter(
+        is_published=True
+    ).annotate(total=Count('post')).order_by('-total').first()
+
+    guest = Client(HTTP_HOST='localhost')
+    owner = Client(HTTP_HOST='localhost')
+    owner.force_login(author)
+
+    def page_count(queryset):
+        pages = -(-queryset.count() // POSTS_AMOUNT)
+        return max(1, min(depth, pages))
+
+    index_pages = page_count(published)
+    category_pages = page_count(published.in_category(category))
+    profile_pages = page_count(published.by_author(author))
+    cursor = deep_cursor(published, depth)
+
+    cases = [
+        ('index', reverse('blog:index'), guest),
+        ('index deep', f'{reverse("blog:index")}?page={index_pages}', guest),
+        (
+            'category deep',
+            f'{reverse("blog:category_posts", args=[category.slug])}'
+            f'?page={category_pages}',
+            guest,
+        ),
+        (
+            'profile deep',
+            f'{reverse("blog:profile", args=[author.username])}'
+            f'?page={profile_pages}',
+            guest,
+        ),
+        (
+            'profile deep (author)',
+            f'{reverse("blog:profile", args=[author.username])}'
+            f'?page={profile_pages}',
+            owner,
+        ),
+        ('post_detail', reverse('blog:post_detail', args=[post.pk]), guest),
+        (
+            'comments (json)',
+            f'{reverse("blog:comments", args=[post.pk])}?format=json',
+            guest,
+        ),
+        ('create_post', reverse('blog:create_post'), owner),
+        ('edit_post', reverse('blog:edit_post', args=[post.pk]), owner),
+        ('delete_post', reverse('blog:delete_post', args=[post.pk]), owner),
+        (
+            'edit_profile',
+            reverse('blog:edit_profile', args=[author.username]),
+            owner,
+        ),
+    ]
+    if cursor:
+        cases.insert(2, (
+            'index deep (cursor)',
+            f'{reverse("blog:index")}?cursor={cursor}',
+            guest,
+        ))
+    if comment is not None:
+        commenter = Client(HTTP_HOST='localhost')
+        commenter.force_login(comment.author)
+        cases += [
+            (
+                'edit_comment',
+                reverse('blog:edit_comment', args=[post.pk, comment.pk]),
+                commenter,
+            ),
+            (
+                'delete_comment',
+                reverse('blog:delete_comment', args=[post.pk, comment.pk]),
+                commenter,
+            ),
+        ]
+    # add_comment принимает только POST: каждый повтор создаёт комментарий
+    # с текстом «Замер.», поэтому замер можно отключить --skip-writes.
+    cases.append((
+        'add_comment',
+        reverse('blog:add_comment', args=[post.pk]),
+        owner,
+    ))
+    return cases
+
+
+def measure(name, url, client, repeat, warm):
+    timings = []
+    queries = []
+    for _ in range(repeat):
+        if not warm:
+            for cache in caches.all():
+                cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            if name == 'add_comment':
+                response = client.post(url, {'text': 'Замер.'})
+            else:
+                response = client.get(url)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            sys.exit(f'{name}: {url} ответил {response.status_code}.')
+        timings.append(elapsed * 1000)
+        queries.append(len(context.captured_queries))
+    return {
+        'url': url,
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'queries': max(queries),
+    }
+
+
+def print_report(results, baseline=None):
+    header = f'{"view":<24}{"p50, мс":>10}{"p95, мс":>10}{"запросы":>10}'
+    if baseline:
+        header += f'{"Δ p50":>10}{"Δ запр.":>10}'
+    print(header)
+    for name, result in results.items():
+        line = (
+            f'{name:<24}{result["p50_ms"]:>10}{result["p95_ms"]:>10}'
+            f'{result["queries"]:>10}'
+        )
+        previous = (baseline or {}).get(name)
+        if previous:
+            line += (
+                f'{result["p50_ms"] - previous["p50_ms"]:>+10.2f}'
+                f'{result["queries"] - previous["queries"]:>+10}'
+            )
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument(
+        '--depth',
+        type=int,
+        default=500,
+        help='Номер «глубокой» страницы лент.',
+    )
+    parser.add_argument(
+        '--warm',
+        action='store_true',
+        help='Не очищать кэши между повторами.',
+    )
+    parser.add_argument(
+        '--skip-writes',
+        action='store_true',
+        help='Не замерять add_comment, который создаёт комментарии.',
+    )
+    parser.add_argument('--json', help='Сохранить результаты в файл.')
+    parser.add_argument('--compare', help='Файл с прошлыми результатами.')
+    args = parser.parse_args()
+
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'localhost']
+    # Строки метрик каждого запроса заглушили бы отчёт, предупреждения
+    # о превышении бюджетов остаются.
+    logging.getLogger('blogicum.performance').setLevel(logging.WARNING)
+    results = {}
+    for name, url, client in build_cases(args.depth):
+        if args.skip_writes and name == 'add_comment':
+            continue
+        results[name] = measure(name, url, client, args.repeat, args.warm)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+    print_report(results, baseline)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Location, Post
+from .models import Category, Comment, ImageJob, Location, Post
 
 
 @admin.register(Post)
@@ -29,3 +29,12 @@ class CommentAdmin(admin.ModelAdmin):
     list_display = ['text', 'author', 'post', 'created_at']
     search_fields = ['text', 'author', 'post']
     list_filter = ['author', 'post', 'created_at']
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = [
+        'image_name', 'post', 'status', 'attempts', 'run_after', 'updated_at'
+    ]
+    search_fields = ['image_name']
+    list_filter = ['status']
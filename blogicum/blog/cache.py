@@ -0,0 +1,96 @@
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+
+from blogicum.constants import CACHE_LOCK_TIMEOUT, CACHE_LOCK_WAIT
+
+
+def get_cache():
+    return caches[getattr(settings, 'BLOG_CACHE_ALIAS', 'default')]
+
+
+def delete_fragment(fragment_name, vary_on):
+    # Тег {% cache %} пишет во фрагментный кэш, если он настроен.
+    try:
+        cache = caches['template_fragments']
+    except InvalidCacheBackendError:
+        cache = caches['default']
+    cache.delete(make_template_fragment_key(fragment_name, vary_on))
+
+
+def _version_key(namespace):
+    return f'blog:{namespace}:version'
+
+
+def get_version(namespace):
+    cache = get_cache()
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        cache.add(_version_key(namespace), 1, None)
+        version = cache.get(_version_key(namespace), 1)
+    return version
+
+
+def bump_version(namespace):
+    """Инвалидирует все ключи пространства имён разом."""
+    cache = get_cache()
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.add(_version_key(namespace), 2, None)
+
+
+def make_key(namespace, *parts):
+    suffix = ':'.join(str(part) for part in parts)
+    return f'blog:{namespace}:v{get_version(namespace)}:{suffix}'
+
+
+def delete(namespace, *parts):
+    get_cache().delete(make_key(namespace, *parts))
+
+
+def get_or_set(namespace, parts, producer, timeout, beta=1.0):
+    """Возвращает значение из кэша, вычисляя его через producer().
+
+    Защита от лавины запросов: значение обновляется немного раньше
+    истечения с вероятностью, растущей к концу срока жизни
+    (probabilistic early expiration), а пересчёт выполняет только
+    процесс, захвативший блокировку. Остальные получают прежнее
+    значение или недолго ждут нового. None не кэшируется: отсутствие
+    объекта (например, ещё не зарегистрированного автора) проверяется
+    при каждом запросе.
+    """
+    cache = get_cache()
+    key = make_key(namespace, *parts)
+    lock_key = f'{key}:lock'
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expires_at = entry
+        early = delta * beta * math.log(random.random() or 1e-12)
+        if time.time() - early < expires_at:
+            return value
+    locked = cache.add(lock_key, 1, CACHE_LOCK_TIMEOUT)
+    if not locked:
+        if entry is not None:
+            return entry[0]
+        deadline = time.monotonic() + CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry[0]
+
+    try:
+        started = time.monotonic()
+        value = producer()
+        delta = time.monotonic() - started
+        if value is not None:
+            cache.set(key, (value, delta, time.time() + timeout), timeout)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return value
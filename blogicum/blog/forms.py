@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth import get_user_model
 
+from . import image_jobs
 from .models import Comment, Post
 
 
@@ -17,6 +18,12 @@ class PostForm(forms.ModelForm):
             'pub_date': forms.DateInput(attrs={'type': 'date'}),
         }
 
+    def save(self, commit=True):
+        post = super().save(commit)
+        if commit and 'image' in self.changed_data:
+            image_jobs.enqueue(post)
+        return post
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,87 @@
+"""Очередь обработки фото публикаций в таблице ImageJob.
+
+Копии изображений создаются вне запроса командой process_image_jobs.
+Задание захватывается условным UPDATE, поэтому несколько процессов
+обработки не возьмут одно задание дважды и внешний брокер не нужен.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from blogicum.constants import (
+    IMAGE_JOB_MAX_ATTEMPTS,
+    IMAGE_JOB_RETRY_DELAY,
+    IMAGE_JOB_TIMEOUT,
+)
+from .models import ImageJob, Post
+
+
+def enqueue(post):
+    post.image_status = (
+        Post.ImageStatus.PENDING if post.image else Post.ImageStatus.READY
+    )
+    with transaction.atomic():
+        post.save(update_fields=['image_status'])
+        ImageJob.objects.create(post=post, image_name=post.image.name or '')
+
+
+def _available(now):
+    # Задания, брошенные упавшим обработчиком, возвращаются в работу
+    # по истечении IMAGE_JOB_TIMEOUT.
+    return Q(
+        status=ImageJob.Status.PENDING, run_after__lte=now
+    ) | Q(
+        status=ImageJob.Status.PROCESSING,
+        updated_at__lt=now - timedelta(seconds=IMAGE_JOB_TIMEOUT),
+    )
+
+
+def claim(limit):
+    now = timezone.now()
+    claimed = []
+    candidates = ImageJob.objects.filter(
+        _available(now)
+    ).order_by('run_after', 'pk').values_list('pk', flat=True)[:limit]
+    for pk in list(candidates):
+        if ImageJob.objects.filter(_available(now), pk=pk).update(
+            status=ImageJob.Status.PROCESSING,
+            attempts=F('attempts') + 1,
+            updated_at=timezone.now(),
+        ):
+            claimed.append(pk)
+    return claimed
+
+
+def process(job_id):
+    """Создаёт копии фото для задания; возвращает его итоговый статус."""
+    job = ImageJob.objects.select_related('post').filter(pk=job_id).first()
+    if job is None:
+        # Публикацию удалили вместе с заданием.
+        return None
+    post = job.post
+    if (post.image.name or '') != job.image_name:
+        # Фото успели заменить: копии сделает более новое задание.
+        job.status = ImageJob.Status.DONE
+        job.save(update_fields=['status', 'updated_at'])
+        return job.status
+    try:
+        post.update_image_derivatives()
+    except Exception as error:
+        job.last_error = f'{type(error).__name__}: {error}'
+        if job.attempts >= IMAGE_JOB_MAX_ATTEMPTS:
+            job.status = ImageJob.Status.FAILED
+            # Карточка покажет оригинал вместо заглушки.
+            post.image_status = Post.ImageStatus.FAILED
+            post.save(update_fields=['image_status'])
+        else:
+            job.status = ImageJob.Status.PENDING
+            job.run_after = timezone.now() + timedelta(
+                seconds=IMAGE_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            )
+    else:
+        job.status = ImageJob.Status.DONE
+        job.last_error = ''
+    job.save()
+    return job.status
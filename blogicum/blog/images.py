@@ -0,0 +1,119 @@
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from blogicum.constants import (
+    IMAGE_DERIVATIVE_WIDTHS,
+    IMAGE_JPEG_QUALITY,
+    IMAGE_WEBP_QUALITY,
+)
+
+
+def _encode(image, image_format):
+    buffer = BytesIO()
+    if image_format == 'JPEG':
+        image.convert('RGB').save(
+            buffer, 'JPEG', quality=IMAGE_JPEG_QUALITY,
+            optimize=True, progressive=True,
+        )
+    elif image_format == 'WEBP':
+        image.save(buffer, 'WEBP', quality=IMAGE_WEBP_QUALITY, method=4)
+    else:
+        image.save(buffer, image_format, optimize=True)
+    return ContentFile(buffer.getvalue())
+
+
+def build_derivatives(field_file):
+    """Сохраняет уменьшенные копии изображения рядом с оригиналом.
+
+    Возвращает словарь для Post.image_derivatives:
+    {'card': {'width': 640, 'image': путь, 'webp': путь}, ...}.
+    Размеры шире оригинала не создаются — для них годится оригинал.
+    """
+    storage = field_file.storage
+    stem, _ = posixpath.splitext(field_file.name)
+    with field_file.open('rb'), Image.open(field_file) as source:
+        source = ImageOps.exif_transpose(source)
+        has_alpha = 'A' in source.getbands()
+        fallback_format, extension = (
+            ('PNG', 'png') if has_alpha else ('JPEG', 'jpg')
+        )
+        derivatives = {}
+        for name, width in IMAGE_DERIVATIVE_WIDTHS.items():
+            if width >= source.width:
+                continue
+            height = max(round(source.height * width / source.width), 1)
+            resized = source.resize((width, height), Image.Resampling.LANCZOS)
+            derivatives[name] = {
+                'width': width,
+                'image': storage.save(
+                    f'{stem}.{name}.{extension}',
+                    _encode(resized, fallback_format),
+                ),
+                'webp': storage.save(
+                    f'{stem}.{name}.webp', _encode(resized, 'WEBP')
+                ),
+            }
+        derivatives['original'] = {'width': source.width}
+    return derivatives
+
+
+def image_names(image_name, derivatives):
+    """Все файлы фото публикации: оригинал и его копии."""
+    names = {image_name} if image_name else set()
+    for derivative in (derivatives or {}).values():
+        names.update(
+            derivative[key] for key in ('image', 'webp') if key in derivative
+        )
+    return names
+
+
+class ImageVariants:
+    """Адреса копий изображения публикации для шаблонов."""
+
+    def __init__(self, field_file, derivatives):
+        self.field_file = field_file
+        self.derivatives = derivatives or {}
+
+    def _sized(self):
+        return sorted(
+            (d for d in self.derivatives.values() if 'image' in d),
+            key=lambda derivative: derivative['width'],
+        )
+
+    def _srcset(self, key):
+        sized = self._sized()
+        if not sized:
+            return ''
+        candidates = [
+            f'{self.field_file.storage.url(d[key])} {d["width"]}w'
+            for d in sized
+        ]
+        original = self.derivatives.get('original', {}).get('width')
+        if key == 'image' and original:
+            candidates.append(f'{self.field_file.url} {original}w')
+        return ', '.join(candidates)
+
+    def _url(self, name):
+        derivative = self.derivatives.get(name)
+        if derivative and 'image' in derivative:
+            return self.field_file.storage.url(derivative['image'])
+        return self.field_file.url
+
+    @property
+    def card_url(self):
+        return self._url('card')
+
+    @property
+    def detail_url(self):
+        return self._url('detail')
+
+    @property
+    def srcset(self):
+        return self._srcset('image')
+
+    @property
+    def webp_srcset(self):
+        return self._srcset('webp')
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Заполняет Post.excerpt для публикаций пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько публикаций обновлять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересчитать все публикации, а не только без excerpt.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0,
+            help='Пауза между пачками в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.order_by('pk').only('text', 'excerpt')
+        if not options['all']:
+            queryset = queryset.filter(excerpt='')
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            changed = []
+            for post in batch:
+                excerpt = Post.build_excerpt(post.text)
+                if excerpt != post.excerpt:
+                    post.excerpt = excerpt
+                    changed.append(post)
+            with transaction.atomic():
+                Post.objects.bulk_update(changed, ['excerpt'])
+            updated += len(changed)
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено публикаций: {updated}.'
+        ))
@@ -0,0 +1,178 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from blog.images import image_names
+from blog.models import ImageBlob, Post
+
+
+def scan(directory, recursive=True):
+    """Файлы каталога: (путь, размер, время изменения)."""
+    found = []
+    pending = [directory]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    found.append((entry.path, stat.st_size, stat.st_mtime))
+    return found
+
+
+def referenced_by_posts(names, chunk_size=100):
+    """Имена из names, на которые ссылается какая-либо публикация.
+
+    Поиск в image_derivatives — полный просмотр таблицы, поэтому он
+    выполняется только здесь, вне запросов пользователей.
+    """
+    names = sorted(set(names))
+    referenced = set()
+    # Имена проверяются частями: длинная цепочка OR упирается
+    # в ограничение глубины выражения SQLite.
+    for start in range(0, len(names), chunk_size):
+        chunk = names[start:start + chunk_size]
+        condition = Q(image__in=chunk)
+        for name in chunk:
+            condition |= Q(image_derivatives__icontains=name)
+        for image, derivatives in Post.objects.filter(
+            condition
+        ).values_list('image', 'image_derivatives'):
+            referenced |= image_names(image, derivatives)
+    return referenced & set(names)
+
+
+def remove(path, deadline):
+    try:
+        # Файл могли переиспользовать после сканирования: хранилище
+        # по хешу обновляет время изменения при повторной загрузке.
+        if os.stat(path).st_mtime < deadline:
+            os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def scan_parallel(root, pool):
+    # Подкаталоги (шарды хранилища по хешу) сканируются параллельно.
+    with os.scandir(root) as entries:
+        subdirectories = [
+            entry.path for entry in entries
+            if entry.is_dir(follow_symlinks=False)
+        ]
+    files = scan(root, recursive=False)
+    for found in pool.map(scan, subdirectories):
+        files += found
+    return files
+
+
+class Command(BaseCommand):
+    help = (
+        'Находит в каталоге фото публикаций файлы, на которые не '
+        'ссылается ни одна публикация, и удаляет их.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=Post._meta.get_field('image').upload_to,
+            help='Каталог внутри MEDIA_ROOT.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Сколько потоков сканируют и удаляют файлы.',
+        )
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=60 * 60,
+            help=(
+                'Не трогать файлы моложе стольких секунд: они могут '
+                'принадлежать загрузке, которая ещё не сохранена.'
+            ),
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Сколько публикаций читать из базы за раз.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать найденные файлы.',
+        )
+
+    def referenced(self, batch_size):
+        names = set()
+        rows = Post.objects.exclude(image='').values_list(
+            'image', 'image_derivatives'
+        ).iterator(batch_size)
+        for image, derivatives in rows:
+            names |= image_names(image, derivatives)
+        names.update(ImageBlob.objects.filter(
+            ref_count__gt=0
+        ).values_list('name', flat=True).iterator(batch_size))
+        return names
+
+    def still_referenced(self, names, batch_size):
+        # Ссылки могли появиться, пока шло сканирование каталога.
+        names = list(names)
+        referenced = set()
+        for start in range(0, len(names), batch_size):
+            batch = names[start:start + batch_size]
+            referenced.update(ImageBlob.objects.filter(
+                name__in=batch, ref_count__gt=0
+            ).values_list('name', flat=True))
+            referenced |= referenced_by_posts(batch)
+        return referenced
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        media_root = os.path.abspath(settings.MEDIA_ROOT)
+        root = os.path.join(media_root, options['path'])
+        if not os.path.isdir(root):
+            self.stdout.write(f'Каталог {root} не найден.')
+            return
+        referenced = self.referenced(options['batch_size'])
+        deadline = time.time() - options['min_age']
+        with ThreadPoolExecutor(max(options['workers'], 1)) as pool:
+            files = scan_parallel(root, pool)
+            orphans = {
+                os.path.relpath(path, media_root).replace(os.sep, '/'):
+                (path, size)
+                for path, size, modified in files
+                if modified < deadline
+                and os.path.relpath(path, media_root).replace(os.sep, '/')
+                not in referenced
+            }
+            for name in self.still_referenced(
+                orphans, options['batch_size']
+            ):
+                del orphans[name]
+            orphans = list(orphans.values())
+            if not options['dry_run']:
+                list(pool.map(
+                    lambda path: remove(path, deadline),
+                    (path for path, _ in orphans),
+                ))
+
+        elapsed = time.monotonic() - started
+        freed = sum(size for _, size in orphans)
+        if options['verbosity'] > 1 or options['dry_run']:
+            for path, _ in orphans:
+                self.stdout.write(os.path.relpath(path, media_root))
+        action = 'Найдено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Просмотрено файлов: {len(files)} '
+            f'({len(files) / elapsed if elapsed else len(files):.0f} '
+            f'в секунду). {action} лишних: {len(orphans)}, '
+            f'{freed / 1024 / 1024:.1f} МБ.'
+        ))
@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from blog.models import Category, Comment, Post
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Печатает планы выполнения (EXPLAIN) запросов лент блога.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Выполнить EXPLAIN ANALYZE (PostgreSQL, MySQL).',
+        )
+
+    def get_feed_queries(self):
+        category = Category.objects.filter(is_published=True).first()
+        author = User.objects.first()
+        post = Post.objects.first()
+
+        feed = Post.objects.get_published().for_feed()
+        yield 'blog:index', feed
+        if category:
+            yield 'blog:category_posts', feed.in_category(category)
+        if author:
+            yield 'blog:profile (гость)', feed.by_author(author)
+            yield (
+                'blog:profile (автор)',
+                Post.objects.get_published(user=author).by_author(
+                    author
+                ).for_feed(),
+            )
+        if post:
+            yield 'blog:post_detail (комментарии)', Comment.objects.filter(
+                post=post
+            )
+
+    def handle(self, *args, **options):
+        explain_options = {'analyze': True} if options['analyze'] else {}
+        for name, queryset in self.get_feed_queries():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write('')
@@ -0,0 +1,141 @@
+import csv
+import gzip
+import time
+from datetime import datetime, time as day_start
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from blog.models import Comment, Post
+
+
+MODELS = {
+    'post': Post,
+    'comment': Comment,
+}
+
+
+def parse_since(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        date = parse_date(value)
+        if date is None:
+            raise CommandError(
+                f'--since: ожидается дата или дата и время, получено {value}.'
+            )
+        moment = datetime.combine(date, day_start.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class JSONLinesWriter:
+    def __init__(self, file, fields):
+        self.file = file
+        self.encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+    def write(self, row):
+        self.file.write(self.encoder.encode(row))
+        self.file.write('\n')
+
+
+class CSVWriter:
+    def __init__(self, file, fields):
+        self.writer = csv.DictWriter(file, fieldnames=fields)
+        self.writer.writeheader()
+        self.encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+    def format(self, value):
+        # Значения JSONField пишутся как JSON, а не как repr() словаря.
+        if isinstance(value, (dict, list)):
+            return self.encoder.encode(value)
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+    def write(self, row):
+        self.writer.writerow({
+            name: self.format(value) for name, value in row.items()
+        })
+
+
+WRITERS = {
+    'jsonl': JSONLinesWriter,
+    'csv': CSVWriter,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает публикации и комментарии в JSON Lines или CSV. '
+        'Строки читаются из базы частями, поэтому расход памяти '
+        'не зависит от размера таблиц.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            choices=[*MODELS, 'all'],
+            default='all',
+        )
+        parser.add_argument(
+            '--format',
+            choices=list(WRITERS),
+            default='jsonl',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы выгрузки.',
+        )
+        parser.add_argument(
+            '--since',
+            help='Выгрузить только записи, добавленные не раньше этой даты.',
+        )
+        parser.add_argument(
+            '--output',
+            default='.',
+            help='Каталог для файлов выгрузки.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Сколько строк читать из базы за раз.',
+        )
+
+    def handle(self, *args, **options):
+        since = parse_since(options['since']) if options['since'] else None
+        output = Path(options['output'])
+        output.mkdir(parents=True, exist_ok=True)
+        names = list(MODELS) if options['model'] == 'all' else [
+            options['model']
+        ]
+        for name in names:
+            started = time.monotonic()
+            path = output / f'{name}s.{options["format"]}'
+            if options['gzip']:
+                path = path.with_name(f'{path.name}.gz')
+            rows = self.export(
+                MODELS[name], path, WRITERS[options['format']],
+                since, options['chunk_size'],
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'{path}: {rows} строк за {time.monotonic() - started:.1f} с.'
+            ))
+
+    def export(self, model, path, writer_class, since, chunk_size):
+        fields = [field.attname for field in model._meta.concrete_fields]
+        queryset = model.objects.order_by('pk')
+        if since is not None:
+            queryset = queryset.filter(created_at__gte=since)
+        opener = gzip.open if path.suffix == '.gz' else open
+        rows = 0
+        with opener(path, 'wt', encoding='utf-8', newline='') as file:
+            writer = writer_class(file, fields)
+            # На PostgreSQL iterator() читает через серверный курсор.
+            for row in queryset.values(*fields).iterator(chunk_size):
+                writer.write(row)
+                rows += 1
+        return rows
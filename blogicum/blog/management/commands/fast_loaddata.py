@@ -0,0 +1,229 @@
+import gzip
+import json
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from blog import scheduler
+from blog.cache import bump_version
+from blog.models import Comment, Post
+from blog.storage import acquire
+
+
+# Модели загружаются проходами по файлу в порядке внешних ключей,
+# поэтому порядок записей в самом дампе не важен.
+STAGES = (
+    ('auth.user',),
+    ('blog.category', 'blog.location'),
+    ('blog.post',),
+    ('blog.comment',),
+)
+SEPARATORS = re.compile(r'[\s,]*')
+
+
+def iter_fixture(path, chunk_size=1 << 16):
+    """Читает JSON-массив дампа по одному объекту, не загружая файл."""
+    decoder = json.JSONDecoder()
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as file:
+        buffer, position = '', 0
+        started = finished = False
+        while True:
+            position = SEPARATORS.match(buffer, position).end()
+            if position < len(buffer):
+                if not started:
+                    if buffer[position] != '[':
+                        raise CommandError(
+                            f'{path}: ожидался JSON-массив объектов.'
+                        )
+                    started = True
+                    position += 1
+                    continue
+                if buffer[position] == ']':
+                    return
+                try:
+                    record, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError as error:
+                    if finished:
+                        raise CommandError(f'{path}: {error}')
+                else:
+                    yield record
+                    continue
+            elif finished:
+                raise CommandError(f'{path}: файл оборван.')
+            chunk = file.read(chunk_size)
+            finished = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+
+
+@contextmanager
+def keep_timestamps(model):
+    # bulk_create() вызывает pre_save(), и поля auto_now/auto_now_add
+    # затёрли бы даты из дампа.
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield fields
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает дамп в формате loaddata (JSON, можно .gz) '
+        'для пользователей и моделей блога: файл читается потоком, '
+        'объекты вставляются через bulk_create пачками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Путь к файлу дампа.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько объектов вставлять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--ignore-conflicts',
+            action='store_true',
+            help='Пропускать объекты, которые уже есть в базе.',
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Псевдоним базы данных.',
+        )
+
+    def handle(self, *args, **options):
+        self.using = options['database']
+        self.batch_size = options['batch_size']
+        self.ignore_conflicts = options['ignore_conflicts']
+        self.recount_posts = set()
+        path = options['fixture']
+        started = time.monotonic()
+        loaded = Counter()
+        skipped = Counter()
+        for stage in STAGES:
+            self.load_stage(path, stage, loaded, skipped)
+
+        self.recount_comments()
+        self.reset_sequences([apps.get_model(label) for label in loaded])
+        for namespace in ('post_card', 'post', 'profile', 'page',
+                          'feed_count'):
+            bump_version(namespace)
+        scheduler.forget_next_publication()
+
+        elapsed = time.monotonic() - started
+        total = sum(loaded.values())
+        for label, count in loaded.items():
+            self.stdout.write(f'{label}: {count}')
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                'Пропущены записи других моделей (загрузите их loaddata): '
+                + ', '.join(f'{label}: {n}' for label, n in skipped.items())
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {total} за {elapsed:.1f} с '
+            f'({total / elapsed if elapsed else total:.0f} в секунду).'
+        ))
+
+    def load_stage(self, path, stage, loaded, skipped):
+        known = {label for labels in STAGES for label in labels}
+        batches = {label: [] for label in stage}
+        for record in iter_fixture(path):
+            label = str(record.get('model', '')).lower()
+            if label not in batches:
+                if stage is STAGES[0] and label not in known:
+                    skipped[label] += 1
+                continue
+            batches[label].append(record)
+            if len(batches[label]) >= self.batch_size:
+                loaded[label] += self.load_batch(batches[label])
+                batches[label] = []
+        for label, batch in batches.items():
+            if batch:
+                loaded[label] += self.load_batch(batch)
+
+    def load_batch(self, records):
+        deserialized = list(serializers.deserialize(
+            'python', records, using=self.using, ignorenonexistent=True
+        ))
+        model = type(deserialized[0].object)
+        objects = [item.object for item in deserialized]
+        with keep_timestamps(model) as timestamps:
+            now = timezone.now()
+            for obj in objects:
+                for field in timestamps:
+                    if getattr(obj, field.attname) is None:
+                        setattr(obj, field.attname, now)
+                if model is Post and not obj.excerpt:
+                    obj.excerpt = Post.build_excerpt(obj.text)
+            with transaction.atomic(using=self.using):
+                if model is Post:
+                    self.acquire_images(objects)
+                model.objects.using(self.using).bulk_create(
+                    objects, ignore_conflicts=self.ignore_conflicts
+                )
+                self.load_m2m(model, deserialized)
+
+        if model is Post:
+            self.recount_posts.update(obj.pk for obj in objects)
+        elif model is Comment:
+            self.recount_posts.update(obj.post_id for obj in objects)
+        return len(objects)
+
+    def acquire_images(self, posts):
+        # bulk_create() не вызывает сигналы, поэтому ссылки на файлы фото
+        # учитываются здесь, иначе удаление одной из публикаций с общим
+        # файлом удалило бы его. Уже загруженные публикации не считаются.
+        existing = set(Post.objects.using(self.using).filter(
+            pk__in=[post.pk for post in posts if post.pk is not None]
+        ).values_list('pk', flat=True)) if self.ignore_conflicts else set()
+        acquire([
+            name for post in posts if post.pk not in existing
+            for name in post.image_names
+        ])
+
+    def load_m2m(self, model, deserialized):
+        for name in {name for item in deserialized for name in item.m2m_data}:
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            through.objects.using(self.using).bulk_create([
+                through(**{
+                    field.m2m_column_name(): item.object.pk,
+                    field.m2m_reverse_name(): related_pk,
+                })
+                for item in deserialized
+                for related_pk in item.m2m_data.get(name, ())
+            ], batch_size=self.batch_size, ignore_conflicts=True)
+
+    def recount_comments(self):
+        post_ids = sorted(self.recount_posts)
+        for start in range(0, len(post_ids), self.batch_size):
+            with transaction.atomic(using=self.using):
+                Post.objects.using(self.using).filter(
+                    pk__in=post_ids[start:start + self.batch_size]
+                ).recount_comments()
+
+    def reset_sequences(self, models):
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
@@ -0,0 +1,166 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+
+
+User = get_user_model()
+
+WORDS = (
+    'день', 'город', 'дорога', 'встреча', 'письмо', 'вечер', 'утро', 'сад',
+    'поезд', 'море', 'книга', 'театр', 'обед', 'друг', 'зима', 'лето',
+    'весна', 'осень', 'дождь', 'солнце', 'работа', 'прогулка', 'музыка',
+    'разговор', 'новость', 'дом', 'улица', 'окно', 'чай', 'гость',
+)
+
+
+def skewed_weights(size, exponent=1.1):
+    # Распределение Ципфа: немногие авторы, категории и публикации
+    # собирают большую часть записей и комментариев.
+    return [1 / (rank ** exponent) for rank in range(1, size + 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетические данные блога для нагрузочных замеров: '
+        'пользователей, категории, местоположения, публикации и '
+        'комментарии с неравномерным распределением.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--locations', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument('--comments', type=int, default=50_000)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--unpublished-share',
+            type=float,
+            default=0.05,
+            help='Доля снятых с публикации записей.',
+        )
+        parser.add_argument(
+            '--scheduled-share',
+            type=float,
+            default=0.02,
+            help='Доля отложенных публикаций.',
+        )
+        parser.add_argument('--seed', type=int, default=None)
+
+    def text(self, words):
+        return ' '.join(random.choices(WORDS, k=words)).capitalize() + '.'
+
+    def bulk_create(self, model, objects, batch_size):
+        """Создаёт объекты пачками и возвращает их pk по порядку.
+
+        bulk_create() не заполняет pk на SQLite, поэтому новые строки
+        находятся по pk больше прежнего максимума.
+        """
+        last_pk = model.objects.aggregate(last=Max('pk'))['last'] or 0
+        for start in range(0, len(objects), batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(objects[start:start + batch_size])
+        return list(
+            model.objects.filter(pk__gt=last_pk)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 and options['posts']:
+            raise CommandError('Для публикаций нужен хотя бы один автор.')
+        random.seed(options['seed'])
+        batch_size = options['batch_size']
+        started = time.monotonic()
+        now = timezone.now()
+        run = int(now.timestamp())
+
+        password = make_password('benchmark')
+        users = self.bulk_create(User, [
+            User(username=f'bench_{run}_{n}', password=password)
+            for n in range(options['users'])
+        ], batch_size)
+        categories = self.bulk_create(Category, [
+            Category(
+                title=self.text(2),
+                description=self.text(12),
+                slug=f'bench-{run}-{n}',
+                is_published=random.random() > 0.1,
+            )
+            for n in range(options['categories'])
+        ], batch_size)
+        locations = self.bulk_create(Location, [
+            Location(name=self.text(1))
+            for _ in range(options['locations'])
+        ], batch_size)
+
+        post_count = options['posts']
+        comment_targets = random.choices(
+            range(post_count),
+            weights=skewed_weights(post_count),
+            k=options['comments'],
+        ) if post_count else []
+        comments_per_post = [0] * post_count
+        for index in comment_targets:
+            comments_per_post[index] += 1
+
+        author_weights = skewed_weights(len(users))
+        category_weights = skewed_weights(len(categories))
+        posts = []
+        for index in range(post_count):
+            text = self.text(random.randint(20, 400))
+            if random.random() < options['scheduled_share']:
+                pub_date = now + timedelta(
+                    minutes=random.randint(1, 60 * 24 * 30)
+                )
+            else:
+                pub_date = now - timedelta(
+                    minutes=random.randint(1, 60 * 24 * 365 * 3)
+                )
+            posts.append(Post(
+                title=self.text(random.randint(2, 6)),
+                text=text,
+                excerpt=Post.build_excerpt(text),
+                pub_date=pub_date,
+                author_id=random.choices(users, author_weights)[0],
+                category_id=(
+                    random.choices(categories, category_weights)[0]
+                    if categories else None
+                ),
+                location_id=(
+                    random.choice(locations)
+                    if locations and random.random() > 0.3 else None
+                ),
+                is_published=(
+                    random.random() >= options['unpublished_share']
+                ),
+                comment_count=comments_per_post[index],
+            ))
+        posts = self.bulk_create(Post, posts, batch_size)
+
+        comments = [
+            Comment(
+                post_id=post_id,
+                author_id=random.choice(users),
+                text=self.text(random.randint(3, 60)),
+            )
+            for post_id, count in zip(posts, comments_per_post)
+            for _ in range(count)
+        ]
+        comment_total = len(self.bulk_create(Comment, comments, batch_size))
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(users)}, категорий '
+            f'{len(categories)}, местоположений {len(locations)}, '
+            f'публикаций {len(posts)}, комментариев {comment_total} '
+            f'за {elapsed:.1f} с.'
+        ))
@@ -0,0 +1,71 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog import image_jobs
+from blog.models import ImageJob
+
+
+def process_in_thread(job_id):
+    try:
+        return image_jobs.process(job_id)
+    finally:
+        # У каждого потока своё соединение с БД.
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт копии фото публикаций из очереди ImageJob '
+        'в пуле потоков.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Сколько фото обрабатывать одновременно.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Обработать очередь и выйти (для запуска из cron).',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Пауза в секундах, если очередь пуста.',
+        )
+
+    def handle(self, *args, **options):
+        workers = max(options['workers'], 1)
+        totals = dict.fromkeys(ImageJob.Status.values, 0)
+        started = time.monotonic()
+        with ThreadPoolExecutor(workers) as pool:
+            while True:
+                claimed = image_jobs.claim(workers * 2)
+                if claimed:
+                    # Один обработчик работает в текущем потоке и его
+                    # транзакции, что удобно для отладки и тестов.
+                    statuses = (
+                        map(image_jobs.process, claimed) if workers == 1
+                        else pool.map(process_in_thread, claimed)
+                    )
+                    for status in statuses:
+                        if status is not None:
+                            totals[status] += 1
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {totals[ImageJob.Status.DONE]}, '
+            f'отложено для повтора: {totals[ImageJob.Status.PENDING]}, '
+            f'с ошибкой: {totals[ImageJob.Status.FAILED]} '
+            f'за {time.monotonic() - started:.1f} с.'
+        ))
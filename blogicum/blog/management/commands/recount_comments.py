@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет Post.comment_count с фактическим числом комментариев '
+        'и исправляет расхождения пачками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько публикаций проверять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0,
+            help='Пауза между пачками в секундах, чтобы не нагружать БД.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать количество расхождений.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        actual_count = Post.objects.actual_comment_count()
+        last_pk = 0
+        checked = fixed = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1]
+            checked += len(batch)
+            with transaction.atomic():
+                drifted = Post.objects.filter(pk__in=batch).annotate(
+                    actual=actual_count
+                ).exclude(comment_count=F('actual'))
+                if options['dry_run']:
+                    fixed += drifted.count()
+                else:
+                    fixed += Post.objects.filter(
+                        pk__in=list(drifted.values_list('pk', flat=True))
+                    ).recount_comments()
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        action = 'Найдено' if options['dry_run'] else 'Исправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено публикаций: {checked}. '
+            f'{action} расхождений: {fixed}.'
+        ))
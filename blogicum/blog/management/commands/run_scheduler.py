@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.scheduler import next_publication, release_due_publications
+from blogicum.constants import SCHEDULER_RECHECK_TIMEOUT
+
+
+class Command(BaseCommand):
+    help = (
+        'Сбрасывает кэши лент в момент выхода отложенных публикаций, '
+        'не дожидаясь следующего запроса.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Проверить один раз и выйти (для запуска из cron).',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            released = release_due_publications()
+            if released:
+                self.stdout.write(
+                    f'{timezone.now():%Y-%m-%d %H:%M:%S} '
+                    f'вышло публикаций: {len(released)}'
+                )
+            if options['once']:
+                return
+            pub_date = next_publication()
+            delay = SCHEDULER_RECHECK_TIMEOUT
+            if pub_date is not None:
+                delay = min(
+                    delay, (pub_date - timezone.now()).total_seconds()
+                )
+            time.sleep(max(delay, 0.1))
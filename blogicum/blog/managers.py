@@ -1,20 +1,113 @@
 from django.db import models
+from django.db.models import (
+    Count,
+    F,
+    IntegerField,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+)
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 
 
-class PostManager(models.Manager):
-    def get_published(self, user=None):
-        queryset = self.filter(
-            is_published=True,
-            pub_date__lte=timezone.now(),
-            category__isnull=True
-        ) | self.filter(
+class PublishedQuerySet(models.QuerySet):
+    def _published_condition(self):
+        # Неопубликованных категорий единицы, поэтому вместо JOIN с
+        # категориями и OR по category_id IS NULL используем
+        # некоррелированный подзапрос: условие остаётся на колонках
+        # blog_post и ложится на индекс (is_published, pub_date).
+        from .models import Category
+
+        return Q(
             is_published=True,
             pub_date__lte=timezone.now(),
-            category__is_published=True
+        ) & ~Q(
+            category__in=Category.objects.filter(
+                is_published=False
+            ).values('pk')
         )
 
+    def published(self):
+        return self.filter(self._published_condition())
+
+    def visible_to(self, user=None):
+        condition = self._published_condition()
         if user and user.is_authenticated:
-            queryset = queryset | self.filter(author=user)
+            condition |= Q(author=user)
+        return self.filter(condition)
+
+    def in_category(self, category):
+        return self.filter(category=category)
+
+    def by_author(self, author):
+        return self.filter(author=author)
+
+    def for_feed(self):
+        # Только то, что выводит includes/post_card.html; вместо полного
+        # текста карточка показывает сохранённый Post.excerpt.
+        return self.select_related(
+            'author',
+            'category',
+            'location',
+        ).only(
+            'title',
+            'excerpt',
+            'pub_date',
+            'is_published',
+            'image',
+            'image_status',
+            'image_derivatives',
+            'comment_count',
+            'author__username',
+            'category__title',
+            'category__slug',
+            'category__is_published',
+            'location__name',
+            'location__is_published',
+        )
+
+    def next_publication(self):
+        return self.filter(
+            is_published=True,
+            pub_date__gt=timezone.now(),
+        ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
 
-        return queryset.order_by('-pub_date')
+    def lock(self, pk):
+        """Блокирует строку публикации до конца транзакции.
+
+        Возвращает False, если публикации нет в выборке.
+        """
+        return bool(
+            self.select_for_update().filter(pk=pk).values_list('pk')
+        )
+
+    def change_comment_count(self, delta):
+        return self.update(
+            comment_count=Greatest(F('comment_count') + delta, 0)
+        )
+
+    @staticmethod
+    def actual_comment_count():
+        from .models import Comment
+
+        return Coalesce(
+            Subquery(
+                Comment.objects.filter(post=OuterRef('pk'))
+                .order_by()
+                .values('post')
+                .annotate(total=Count('pk'))
+                .values('total'),
+                output_field=IntegerField(),
+            ),
+            0,
+        )
+
+    def recount_comments(self):
+        return self.update(comment_count=self.actual_comment_count())
+
+
+class PostManager(models.Manager.from_queryset(PublishedQuerySet)):
+    def get_published(self, user=None):
+        return self.visible_to(user).order_by('-pub_date')
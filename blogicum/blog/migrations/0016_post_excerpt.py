@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, help_text='Заполняется автоматически для карточек в лентах.', max_length=512, verbose_name='Начало текста'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Уменьшенные копии фото для карточек и страницы поста.', verbose_name='Копии изображения'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:38
+
+from collections import Counter
+
+import blog.storage
+from django.db import migrations, models
+
+
+def count_image_references(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    ImageBlob = apps.get_model('blog', 'ImageBlob')
+    references = Counter()
+    posts = Post.objects.exclude(image='').values_list(
+        'image', 'image_derivatives'
+    )
+    for image, derivatives in posts.iterator():
+        references[image] += 1
+        for derivative in (derivatives or {}).values():
+            for key in ('image', 'webp'):
+                if key in derivative:
+                    references[derivative[key]] += 1
+    ImageBlob.objects.bulk_create(
+        [
+            ImageBlob(name=name, ref_count=count)
+            for name, count in references.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_image_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Файл')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Ссылок')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+            ],
+            options={
+                'verbose_name': 'файл фото',
+                'verbose_name_plural': 'Файлы фото',
+            },
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=blog.storage.ContentAddressedStorage(), upload_to='birthdays_images', verbose_name='Фото'),
+        ),
+        migrations.RunPython(
+            count_image_references, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+from django.utils.text import Truncator
+
+BATCH_SIZE = 1000
+# Значения EXCERPT_WORDS и EXCERPT_MAX_LENGTH на момент миграции.
+EXCERPT_WORDS = 10
+EXCERPT_MAX_LENGTH = 512
+
+
+def build_excerpt(text):
+    return Truncator(text).words(
+        EXCERPT_WORDS, truncate=' …'
+    )[:EXCERPT_MAX_LENGTH]
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.filter(excerpt='').only('text').order_by('pk')
+    batch = []
+    for post in posts.iterator(BATCH_SIZE):
+        post.excerpt = build_excerpt(post.text)
+        batch.append(post)
+        if len(batch) >= BATCH_SIZE:
+            Post.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    Post.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,27 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib import messages
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.core.exceptions import ImproperlyConfigured
+from django.http import Http404, HttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse
 
+from blogicum.constants import (
+    COMMENTS_AMOUNT,
+    PAGE_CACHE_TIMEOUT,
+    POST_CARD_CACHE_TIMEOUT,
+)
+from .cache import get_cache, get_version, make_key
 from .forms import PostForm
 from .models import Comment, Post
+from .paginators import (
+    CachedCountPaginator,
+    CursorPaginator,
+    InvalidCursor,
+)
+from . import scheduler
 
 
 class AuthorMixin:
@@ -19,10 +37,20 @@ class PostMixin:
     pk_url_kwarg = 'post_id'
 
 
-class AuthorAccessMixin(UserPassesTestMixin):
+class CachedObjectMixin:
+    def get_object(self, queryset=None):
+        # test_func() и UpdateView/DeleteView запрашивают объект каждый
+        # сам по себе; в пределах запроса он загружается один раз.
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+
+class AuthorAccessMixin(CachedObjectMixin, UserPassesTestMixin):
     def test_func(self):
-        post = self.get_object()
-        return post.author.id == self.request.user.id
+        return self.get_object().author_id == self.request.user.pk
 
     def handle_no_permission(self):
         return redirect(
@@ -31,10 +59,9 @@ class AuthorAccessMixin(UserPassesTestMixin):
         )
 
 
-class CommentAuthorAccessMixin(UserPassesTestMixin):
+class CommentAuthorAccessMixin(CachedObjectMixin, UserPassesTestMixin):
     def test_func(self):
-        comment = self.get_object()
-        return comment.author.id == self.request.user.id
+        return self.get_object().author_id == self.request.user.pk
 
     def handle_no_permission(self):
         return redirect(
@@ -47,6 +74,13 @@ class CommentMixin:
     model = Comment
     pk_url_kwarg = 'comment_id'
 
+    def get_queryset(self):
+        # Комментарий ищется по паре (id, post_id) из URL одним запросом:
+        # чужая публикация в адресе даёт 404 без лишних обращений к БД.
+        return super().get_queryset().filter(
+            post_id=self.kwargs.get('post_id')
+        )
+
     def get_success_url(self):
         return reverse(
             'blog:post_detail',
@@ -54,9 +88,139 @@ class CommentMixin:
         )
 
 
+class CommentPaginationMixin:
+    comments_per_page = COMMENTS_AMOUNT
+    comments_ordering = ('created_at', 'pk')
+
+    def get_comments_page(self, post_id, cursor=None):
+        # Keyset-пагинация по индексу (post, created_at): страница
+        # комментариев стоит одинаково и на тысячном комментарии.
+        paginator = CursorPaginator(
+            Comment.objects.filter(post_id=post_id).select_related('author'),
+            self.comments_per_page,
+            ordering=self.comments_ordering,
+        )
+        try:
+            return paginator.page(cursor)
+        except InvalidCursor:
+            raise Http404
+
+
 class UserAccessMixin:
     def test_func(self):
         return self.request.user == self.user
 
     def handle_no_permission(self):
         return redirect('blog:profile', username=self.user.username)
+
+
+class FeedPaginationMixin:
+    paginator_class = CachedCountPaginator
+    cursor_kwarg = 'cursor'
+    cursor_ordering = ('-pub_date', '-pk')
+
+    def use_cursor_pagination(self):
+        return (
+            self.cursor_kwarg in self.request.GET
+            or getattr(settings, 'BLOG_CURSOR_PAGINATION', False)
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(
+            queryset, page_size, ordering=self.cursor_ordering
+        )
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы.')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_count_cache_key(self):
+        return None
+
+    def get_paginator(self, *args, **kwargs):
+        return super().get_paginator(
+            *args, cache_key=self.get_count_cache_key(), **kwargs
+        )
+
+
+class PostCardCacheMixin:
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post_card_timeout'] = POST_CARD_CACHE_TIMEOUT
+        context['post_card_version'] = get_version('post_card')
+        return context
+
+
+class AnonymousPageCacheMixin:
+    """Кэширует страницу целиком для анонимных посетителей.
+
+    Ключ строится по пути и параметрам пагинации в пространстве имён
+    ленты (page:index, page:category:<slug>, page:profile:<username>),
+    которое сбрасывают сигналы при изменении её публикаций.
+    Пространство имён задаёт обязательный атрибут page_cache_namespace —
+    шаблон с параметрами адреса, например 'profile:{username}'.
+    """
+
+    page_cache_params = ('page', 'cursor')
+    page_cache_namespace = None
+
+    def get_page_cache_namespace(self):
+        # Пространство имён без обработчика в signals.py никто бы
+        # не сбрасывал, поэтому значения по умолчанию нет.
+        if self.page_cache_namespace is None:
+            raise ImproperlyConfigured(
+                f'{type(self).__name__} не задаёт page_cache_namespace.'
+            )
+        return self.page_cache_namespace.format(**self.kwargs)
+
+    def is_page_cacheable(self):
+        request = self.request
+        return (
+            request.method in ('GET', 'HEAD')
+            and not request.user.is_authenticated
+            and not len(messages.get_messages(request))
+        )
+
+    def get_page_cache_key(self):
+        params = '&'.join(
+            f'{name}={self.request.GET.get(name, "")}'
+            for name in self.page_cache_params
+        )
+        digest = hashlib.md5(
+            f'{self.request.path}?{params}'.encode()
+        ).hexdigest()
+        return make_key(
+            f'page:{self.get_page_cache_namespace()}',
+            get_version('page'),
+            digest,
+        )
+
+    def get_page_cache_timeout(self):
+        return scheduler.cache_timeout(PAGE_CACHE_TIMEOUT)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.is_page_cacheable():
+            return super().dispatch(request, *args, **kwargs)
+        scheduler.release_due_publications()
+        cache = get_cache()
+        key = self.get_page_cache_key()
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+            response['X-Page-Cache'] = 'hit'
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(
+            response, 'add_post_render_callback'
+        ):
+            timeout = self.get_page_cache_timeout()
+            response.add_post_render_callback(lambda rendered: cache.set(
+                key, (rendered.content, rendered['Content-Type']), timeout
+            ))
+            response['X-Page-Cache'] = 'miss'
+        return response
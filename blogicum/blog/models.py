@@ -1,9 +1,18 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
+from django.utils.text import Truncator
 
 from core.models import BlogModel
-from blogicum.constants import TITLE_MAX_LENGTH, TITLE_SHORT
+from blogicum.constants import (
+    EXCERPT_MAX_LENGTH,
+    EXCERPT_WORDS,
+    TITLE_MAX_LENGTH,
+    TITLE_SHORT,
+)
+from .images import ImageVariants, build_derivatives, image_names
 from .managers import PostManager
+from .storage import ContentAddressedStorage
 
 
 User = get_user_model()
@@ -26,6 +35,13 @@ class Category(BlogModel):
     class Meta(BlogModel.Meta):
         verbose_name = 'категория'
         verbose_name_plural = 'Категории'
+        indexes = [
+            models.Index(
+                fields=['id'],
+                condition=models.Q(is_published=False),
+                name='category_unpublished_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title[:TITLE_SHORT]
@@ -52,6 +68,13 @@ class Post(BlogModel):
         verbose_name='Заголовок'
     )
     text = models.TextField(verbose_name='Текст')
+    excerpt = models.CharField(
+        max_length=EXCERPT_MAX_LENGTH,
+        blank=True,
+        editable=False,
+        verbose_name='Начало текста',
+        help_text='Заполняется автоматически для карточек в лентах.'
+    )
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
         help_text='Если установить дату и время '
@@ -84,7 +107,32 @@ class Post(BlogModel):
     image = models.ImageField(
         'Фото',
         upload_to='birthdays_images',
+        storage=ContentAddressedStorage(),
+        blank=True,
+    )
+
+    class ImageStatus(models.IntegerChoices):
+        READY = 0, 'Готово'
+        PENDING = 1, 'Обрабатывается'
+        FAILED = 2, 'Ошибка обработки'
+
+    image_status = models.PositiveSmallIntegerField(
+        'Состояние фото',
+        choices=ImageStatus.choices,
+        default=ImageStatus.READY,
+        editable=False,
+    )
+    image_derivatives = models.JSONField(
+        default=dict,
         blank=True,
+        editable=False,
+        verbose_name='Копии изображения',
+        help_text='Уменьшенные копии фото для карточек и страницы поста.'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
     )
 
     objects = PostManager()
@@ -93,10 +141,59 @@ class Post(BlogModel):
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['is_published', '-pub_date'],
+                name='post_published_pub_date_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date'],
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=['category', 'is_published', '-pub_date'],
+                name='post_category_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title[:TITLE_SHORT]
 
+    @staticmethod
+    def build_excerpt(text):
+        return Truncator(text).words(
+            EXCERPT_WORDS, truncate=' …'
+        )[:EXCERPT_MAX_LENGTH]
+
+    @property
+    def image_variants(self):
+        return ImageVariants(self.image, self.image_derivatives)
+
+    @property
+    def image_pending(self):
+        return self.image_status == self.ImageStatus.PENDING
+
+    @property
+    def image_names(self):
+        return image_names(self.image.name, self.image_derivatives)
+
+    def update_image_derivatives(self):
+        # Копии прежнего фото удалит сигнал, когда на них не останется
+        # ссылок.
+        self.image_derivatives = (
+            build_derivatives(self.image) if self.image else {}
+        )
+        self.image_status = self.ImageStatus.READY
+        self.save(update_fields=['image_derivatives', 'image_status'])
+
+    def save(self, *args, **kwargs):
+        # Сам excerpt заполняет сигнал pre_save: он срабатывает
+        # и при загрузке дампа (loaddata), минуя этот метод.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
 
 class Comment(BlogModel):
     text = models.TextField('Текст комментария')
@@ -115,3 +212,63 @@ class Comment(BlogModel):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at'],
+                name='comment_post_created_at_idx',
+            ),
+        ]
+
+
+class ImageBlob(models.Model):
+    name = models.CharField('Файл', max_length=255, unique=True)
+    ref_count = models.PositiveIntegerField('Ссылок', default=0)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'файл фото'
+        verbose_name_plural = 'Файлы фото'
+
+    def __str__(self):
+        return self.name
+
+
+class ImageJob(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        PROCESSING = 'processing', 'Обрабатывается'
+        DONE = 'done', 'Готово'
+        FAILED = 'failed', 'Ошибка'
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_jobs',
+        verbose_name='Публикация',
+    )
+    image_name = models.CharField('Файл', max_length=255)
+    status = models.CharField(
+        'Состояние',
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    run_after = models.DateTimeField('Не раньше', default=timezone.now)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'обработка фото'
+        verbose_name_plural = 'Обработка фото'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['status', 'run_after'],
+                name='imagejob_status_run_after_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.image_name} ({self.get_status_display()})'
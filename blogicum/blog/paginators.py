@@ -0,0 +1,206 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from blogicum.constants import (
+    FEED_COUNT_CACHE_TIMEOUT,
+    PAGE_RANGE_ON_EACH_SIDE,
+    PAGE_RANGE_ON_ENDS,
+)
+from . import scheduler
+from .cache import get_or_set
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage:
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация без OFFSET и без COUNT(*).
+
+    Страница выбирается условием по полям сортировки последнего
+    показанного объекта, поэтому стоимость запроса не зависит от глубины.
+    """
+
+    is_cursor = True
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-pk')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = [
+            (field.lstrip('-'), field.startswith('-')) for field in ordering
+        ]
+
+    def _order_by(self, reverse=False):
+        return [
+            f'-{name}' if descending != reverse else name
+            for name, descending in self.ordering
+        ]
+
+    def _get_field(self, name):
+        opts = self.queryset.model._meta
+        return opts.pk if name == 'pk' else opts.get_field(name)
+
+    def encode_cursor(self, obj, direction):
+        # isoformat() сохраняет микросекунды, в отличие от
+        # DjangoJSONEncoder, иначе объекты с той же датой потеряются.
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in (getattr(obj, name) for name, _ in self.ordering)
+        ]
+        payload = json.dumps([direction, values])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4)
+            )
+            direction, values = json.loads(payload)
+            if direction not in ('next', 'prev'):
+                raise ValueError
+            if not isinstance(values, list) or (
+                len(values) != len(self.ordering)
+            ):
+                raise ValueError
+            values = [
+                self._get_field(name).to_python(value)
+                for (name, _), value in zip(self.ordering, values)
+            ]
+            # to_python(None) возвращает None, а сравнивать с NULL
+            # в _seek() нельзя.
+            if any(value is None for value in values):
+                raise ValueError
+        except (
+            binascii.Error, UnicodeDecodeError, TypeError,
+            ValueError, ValidationError,
+        ):
+            raise InvalidCursor(cursor)
+        return direction, values
+
+    def _seek(self, values, reverse=False):
+        # (a, b) после (x, y) при сортировке по убыванию:
+        # a < x OR (a = x AND b < y).
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.ordering, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return self.queryset.filter(condition)
+
+    def page(self, cursor=None):
+        direction, values = (
+            self.decode_cursor(cursor) if cursor else ('next', None)
+        )
+        reverse = direction == 'prev'
+        queryset = self.queryset
+        if values is not None:
+            queryset = self._seek(values, reverse=reverse)
+        rows = list(
+            queryset.order_by(*self._order_by(reverse))[:self.per_page + 1]
+        )
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+        if not rows:
+            return CursorPage(rows, self, None, None)
+
+        has_next = has_more if not reverse else True
+        has_previous = values is not None if not reverse else has_more
+        return CursorPage(
+            rows,
+            self,
+            self.encode_cursor(rows[-1], 'next') if has_next else None,
+            self.encode_cursor(rows[0], 'prev') if has_previous else None,
+        )
+
+
+class FeedPage(Page):
+    @property
+    def elided_page_range(self):
+        return self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=PAGE_RANGE_ON_EACH_SIDE,
+            on_ends=PAGE_RANGE_ON_ENDS,
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор, который кэширует число объектов ленты.
+
+    Кэш сбрасывается сигналами при изменении публикаций и категорий.
+    На больших таблицах PostgreSQL вместо COUNT(*) используется оценка
+    планировщика.
+    """
+
+    def __init__(self, *args, cache_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+    def estimate_count(self):
+        threshold = getattr(settings, 'BLOG_COUNT_ESTIMATE_THRESHOLD', None)
+        queryset = self.object_list
+        if (
+            threshold is None
+            or not hasattr(queryset, 'explain')
+            or connections[queryset.db].vendor != 'postgresql'
+        ):
+            return None
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        return estimate if estimate >= threshold else None
+
+    def _count(self):
+        count = self.estimate_count()
+        return super().count if count is None else count
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return super().count
+        scheduler.release_due_publications()
+        return get_or_set(
+            'feed_count', self.cache_key, self._count,
+            scheduler.cache_timeout(FEED_COUNT_CACHE_TIMEOUT),
+        )
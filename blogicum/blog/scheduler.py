@@ -0,0 +1,63 @@
+"""Учёт отложенных публикаций для кэшей лент.
+
+Лента зависит от времени: публикация с pub_date в будущем появляется в
+ней сама, без сохранения модели, и сигналы post_save об этом не знают.
+Планировщик хранит в кэше ближайшую дату публикации, ограничивает ею
+время жизни кэшей и, когда она наступает, рассылает сигнал
+publications_released с вышедшими публикациями.
+"""
+from django.dispatch import Signal
+from django.utils import timezone
+
+from blogicum.constants import CACHE_LOCK_TIMEOUT, SCHEDULER_RECHECK_TIMEOUT
+from .cache import get_cache
+from .models import Post
+
+
+NEXT_PUBLICATION_KEY = 'blog:scheduler:next_publication'
+RELEASE_LOCK_KEY = 'blog:scheduler:release_lock'
+
+publications_released = Signal()
+
+
+def next_publication():
+    cache = get_cache()
+    entry = cache.get(NEXT_PUBLICATION_KEY)
+    if entry is None:
+        entry = {'pub_date': Post.objects.next_publication()}
+        cache.set(NEXT_PUBLICATION_KEY, entry, SCHEDULER_RECHECK_TIMEOUT)
+    return entry['pub_date']
+
+
+def forget_next_publication():
+    get_cache().delete(NEXT_PUBLICATION_KEY)
+
+
+def release_due_publications():
+    pub_date = next_publication()
+    if pub_date is None or pub_date > timezone.now():
+        return []
+    cache = get_cache()
+    if not cache.add(RELEASE_LOCK_KEY, 1, CACHE_LOCK_TIMEOUT):
+        return []
+    try:
+        posts = list(Post.objects.filter(
+            is_published=True,
+            pub_date__gte=pub_date,
+            pub_date__lte=timezone.now(),
+        ).values('pk', 'author_id', 'category_id'))
+        forget_next_publication()
+        if posts:
+            publications_released.send(sender=Post, posts=posts)
+    finally:
+        cache.delete(RELEASE_LOCK_KEY)
+    return posts
+
+
+def cache_timeout(timeout):
+    """Срок жизни кэша ленты, не выходящий за ближайшую публикацию."""
+    pub_date = next_publication()
+    if pub_date is None:
+        return timeout
+    seconds = int((pub_date - timezone.now()).total_seconds()) + 1
+    return max(1, min(timeout, seconds))
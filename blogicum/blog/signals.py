@@ -0,0 +1,235 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_version, delete, delete_fragment, get_version
+from .images import image_names
+from .models import Category, Comment, Location, Post
+from .scheduler import forget_next_publication, publications_released
+from .storage import acquire, release
+
+
+User = get_user_model()
+
+
+def invalidate_now_and_on_commit(invalidate):
+    # Повторный сброс после коммита не даёт параллельному запросу
+    # закэшировать данные, прочитанные до окончания транзакции.
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def invalidate_post_card(post_id):
+    vary_on = [post_id, get_version('post_card')]
+    invalidate_now_and_on_commit(
+        lambda: delete_fragment('post_card', vary_on)
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_feed_counts(sender, **kwargs):
+    invalidate_now_and_on_commit(lambda: bump_version('feed_count'))
+
+
+def feed_page_namespaces(usernames, slugs):
+    namespaces = ['page:index']
+    namespaces += [f'page:profile:{username}' for username in usernames]
+    namespaces += [f'page:category:{slug}' for slug in slugs]
+    return namespaces
+
+
+def invalidate_feed_pages(author_ids, category_ids):
+    namespaces = feed_page_namespaces(
+        User.objects.filter(
+            pk__in=author_ids
+        ).values_list('username', flat=True),
+        Category.objects.filter(
+            pk__in=category_ids
+        ).values_list('slug', flat=True),
+    )
+    for namespace in namespaces:
+        invalidate_now_and_on_commit(
+            lambda namespace=namespace: bump_version(namespace)
+        )
+
+
+@receiver(pre_save, sender=Post)
+def fill_post_excerpt(sender, instance, update_fields, **kwargs):
+    if update_fields is None or 'excerpt' in update_fields:
+        instance.excerpt = sender.build_excerpt(instance.text)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_post(sender, instance, **kwargs):
+    instance._previous = sender.objects.filter(pk=instance.pk).values(
+        'author_id', 'category_id', 'image', 'image_derivatives'
+    ).first() if instance.pk else None
+
+
+@receiver(post_save, sender=Post)
+def track_post_images(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous', None) or {}
+    previous_names = image_names(
+        previous.get('image'), previous.get('image_derivatives')
+    )
+    current_names = instance.image_names
+    if previous_names != current_names:
+        acquire(current_names - previous_names)
+        release(previous_names - current_names, instance.image.storage)
+
+
+@receiver(post_delete, sender=Post)
+def release_post_images(sender, instance, **kwargs):
+    release(instance.image_names, instance.image.storage)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    invalidate_post_card(instance.pk)
+    invalidate_now_and_on_commit(lambda: delete('post', instance.pk))
+    invalidate_now_and_on_commit(forget_next_publication)
+    previous = getattr(instance, '_previous', None) or {}
+    invalidate_feed_pages(
+        {instance.author_id, previous.get('author_id')},
+        {instance.category_id, previous.get('category_id')},
+    )
+
+
+def flush_comment_posts(post_ids):
+    # Удалённых вместе с комментариями публикаций в выборке уже нет:
+    # их ленты сбросил обработчик удаления Post.
+    posts = Post.objects.filter(pk__in=post_ids).values_list(
+        'author__username', 'category__slug'
+    )
+    usernames, slugs = set(), set()
+    for username, slug in posts:
+        usernames.add(username)
+        if slug is not None:
+            slugs.add(slug)
+    for post_id in post_ids:
+        delete_fragment('post_card', [post_id, get_version('post_card')])
+    if usernames:
+        for namespace in feed_page_namespaces(usernames, slugs):
+            bump_version(namespace)
+
+
+def queue_comment_post(post_id):
+    """Откладывает сброс лент публикации до коммита транзакции.
+
+    Публикации собираются в одно множество на транзакцию, поэтому
+    каскадное удаление сотен комментариев сбрасывает кэши одним
+    запросом после коммита.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        flush_comment_posts({post_id})
+        return
+    pending = getattr(connection, 'blog_comment_posts', None)
+    # После отката транзакции обработчик пропадает из run_on_commit,
+    # и для следующей транзакции заводится новое множество.
+    if pending is None or pending[0] not in [
+        func for _, func in connection.run_on_commit
+    ]:
+        post_ids = set()
+
+        def flush():
+            connection.blog_comment_posts = None
+            flush_comment_posts(post_ids)
+
+        pending = connection.blog_comment_posts = (flush, post_ids)
+        transaction.on_commit(flush)
+    pending[1].add(post_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_post(sender, instance, **kwargs):
+    # Карточку сбрасываем сразу: это операция с кэшем без запросов к БД.
+    delete_fragment(
+        'post_card', [instance.post_id, get_version('post_card')]
+    )
+    queue_comment_post(instance.post_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_post_cards(sender, **kwargs):
+    invalidate_now_and_on_commit(lambda: bump_version('post_card'))
+    invalidate_now_and_on_commit(lambda: bump_version('post'))
+    invalidate_now_and_on_commit(lambda: bump_version('page'))
+
+
+# Поля пользователя, которые выводят страница профиля и карточки.
+PROFILE_FIELDS = (
+    'username', 'first_name', 'last_name', 'date_joined', 'is_staff'
+)
+
+
+def invalidate_profile(username):
+    invalidate_now_and_on_commit(lambda: delete('profile', username))
+    invalidate_now_and_on_commit(
+        lambda: bump_version(f'page:profile:{username}')
+    )
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_user(sender, instance, update_fields, **kwargs):
+    # Вход пользователя сохраняет только last_login — выводимые поля
+    # не меняются.
+    instance._previous = sender.objects.filter(pk=instance.pk).values(
+        *PROFILE_FIELDS
+    ).first() if instance.pk and update_fields != frozenset(
+        {'last_login'}
+    ) else None
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_cards(sender, instance, created, **kwargs):
+    if created:
+        invalidate_now_and_on_commit(
+            lambda: delete('profile', instance.username)
+        )
+        return
+    previous = getattr(instance, '_previous', None)
+    if previous is None or all(
+        previous[name] == getattr(instance, name) for name in PROFILE_FIELDS
+    ):
+        return
+    for username in {previous['username'], instance.username}:
+        invalidate_profile(username)
+    if previous['username'] == instance.username:
+        return
+    # Имя автора выводят карточки и страницы его публикаций.
+    posts = list(Post.objects.filter(author=instance).values_list(
+        'pk', 'category_id'
+    ))
+    for post_id, _ in posts:
+        invalidate_post_card(post_id)
+        invalidate_now_and_on_commit(
+            lambda post_id=post_id: delete('post', post_id)
+        )
+    if posts:
+        invalidate_feed_pages(set(), {category for _, category in posts})
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_author(sender, instance, **kwargs):
+    # Публикации и комментарии автора удаляются каскадом, и их
+    # обработчики сбрасывают остальные кэши.
+    invalidate_profile(instance.username)
+
+
+@receiver(publications_released)
+def invalidate_released_feeds(sender, posts, **kwargs):
+    bump_version('feed_count')
+    invalidate_feed_pages(
+        {post['author_id'] for post in posts},
+        {post['category_id'] for post in posts},
+    )
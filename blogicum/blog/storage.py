@@ -0,0 +1,100 @@
+import hashlib
+import os
+import posixpath
+from collections import Counter
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит каждый уникальный файл один раз под именем из его SHA-256.
+
+    Путь файла: <каталог upload_to>/ab/cd/abcd…<расширение>. Хеш
+    считается по частям, не читая загрузку в память целиком.
+    Повторная загрузка того же фото возвращает уже сохранённое имя.
+    """
+
+    chunk_size = 64 * 1024
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks(self.chunk_size):
+            digest.update(chunk)
+        content.seek(0)
+        hexdigest = digest.hexdigest()
+        root = name.split('/', 1)[0] if '/' in name else ''
+        return posixpath.join(
+            root,
+            hexdigest[:2],
+            hexdigest[2:4],
+            hexdigest + posixpath.splitext(name)[1].lower(),
+        )
+
+    def _save(self, name, content):
+        name = self.content_name(name, content)
+        if self.exists(name):
+            # Свежее время изменения защищает файл от cleanup_media,
+            # который не трогает недавно изменённые файлы.
+            os.utime(self.path(name))
+            return name
+        saved = super()._save(name, content)
+        if saved != name:
+            # Тот же файл одновременно записал другой процесс.
+            super().delete(saved)
+        return name
+
+
+def acquire(names):
+    """Увеличивает счётчики ссылок на файлы.
+
+    Имя, встречающееся несколько раз, получает столько же ссылок.
+    """
+    from .models import ImageBlob
+
+    counts = Counter(names)
+    if not counts:
+        return
+    ImageBlob.objects.bulk_create(
+        [ImageBlob(name=name) for name in counts], ignore_conflicts=True
+    )
+    by_count = {}
+    for name, count in counts.items():
+        by_count.setdefault(count, []).append(name)
+    for count, group in by_count.items():
+        ImageBlob.objects.filter(name__in=group).update(
+            ref_count=F('ref_count') + count
+        )
+
+
+def release(names, storage):
+    """Уменьшает счётчики и после коммита удаляет файлы без ссылок.
+
+    Файлы без записи в ImageBlob не удаляются: на них могут ссылаться
+    другие публикации, их находит команда cleanup_media.
+    """
+    from .models import ImageBlob
+
+    names = set(names)
+    if not names:
+        return
+    ImageBlob.objects.filter(name__in=names, ref_count__gt=0).update(
+        ref_count=F('ref_count') - 1
+    )
+    orphans = set(ImageBlob.objects.filter(
+        name__in=names, ref_count=0
+    ).values_list('name', flat=True))
+    if not orphans:
+        return
+    ImageBlob.objects.filter(name__in=orphans).delete()
+
+    def delete_orphans():
+        # Ссылку могли получить заново, пока транзакция не завершилась.
+        alive = set(ImageBlob.objects.filter(
+            name__in=orphans
+        ).values_list('name', flat=True))
+        for name in orphans - alive:
+            storage.delete(name)
+
+    transaction.on_commit(delete_orphans)
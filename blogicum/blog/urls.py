@@ -21,6 +21,9 @@ urlpatterns = [
     path('posts/<int:post_id>/delete/',
          views.PostsDeleteView.as_view(), name='delete_post'),
 
+    path('posts/<int:post_id>/comments/',
+         views.CommentListView.as_view(), name='comments'),
+
     path('posts/<int:post_id>/comment/',
          views.CommentCreateView.as_view(), name='add_comment'),
 
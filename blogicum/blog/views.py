@@ -1,8 +1,9 @@
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import Http404
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.http import Http404, HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404, render
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
 from django.views.generic import (
@@ -11,16 +12,26 @@ from django.views.generic import (
     DetailView,
     ListView,
     UpdateView,
+    View,
 )
 
-from blogicum.constants import POSTS_AMOUNT
+from blogicum.constants import (
+    POST_CACHE_TIMEOUT,
+    POSTS_AMOUNT,
+    PROFILE_CACHE_TIMEOUT,
+)
+from .cache import get_or_set
 from .forms import CommentForm, UserForm
 from .models import Category, Comment, Post
 from .mixins import (
+    AnonymousPageCacheMixin,
     AuthorMixin,
     AuthorAccessMixin,
     CommentAuthorAccessMixin,
     CommentMixin,
+    CommentPaginationMixin,
+    FeedPaginationMixin,
+    PostCardCacheMixin,
     PostMixin,
 )
 
@@ -28,20 +39,23 @@ from .mixins import (
 User = get_user_model()
 
 
-class PostsDetailView(DetailView):
+class PostsDetailView(CommentPaginationMixin, DetailView):
     pk_url_kwarg = 'post_id'
 
     def get_object(self):
-        post = get_object_or_404(
-            Post.objects.select_related(
+        post_id = self.kwargs[self.pk_url_kwarg]
+        post = get_or_set(
+            'post',
+            [post_id],
+            lambda: Post.objects.select_related(
                 'author',
                 'location',
                 'category',
-            ).prefetch_related(
-                'comments__author',
-            ),
-            pk=self.kwargs[self.pk_url_kwarg],
+            ).filter(pk=post_id).first(),
+            POST_CACHE_TIMEOUT,
         )
+        if post is None:
+            raise Http404
 
         if post.author != self.request.user:
             if (
@@ -60,7 +74,9 @@ class PostsDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.all()
+        context['comments'] = self.get_comments_page(
+            self.object.pk, self.request.GET.get('comments')
+        )
         return context
 
 
@@ -88,19 +104,36 @@ class PostsDeleteView(
     success_url = reverse_lazy('blog:index')
 
 
-class PostsListView(ListView):
+class PostsListView(
+    AnonymousPageCacheMixin,
+    PostCardCacheMixin,
+    FeedPaginationMixin,
+    ListView,
+):
     model = Post
     template_name = 'blog/index.html'
     paginate_by = POSTS_AMOUNT
+    page_cache_namespace = 'index'
     pk_url_kwarg = 'post_id'
-    queryset = Post.objects.get_published()
+
+    def get_queryset(self):
+        return Post.objects.get_published().for_feed()
+
+    def get_count_cache_key(self):
+        return ('index',)
 
 
-class CategoryListView(ListView):
+class CategoryListView(
+    AnonymousPageCacheMixin,
+    PostCardCacheMixin,
+    FeedPaginationMixin,
+    ListView,
+):
     model = Category
     category = None
     template_name = 'blog/category_list.html'
     paginate_by = POSTS_AMOUNT
+    page_cache_namespace = 'category:{category_slug}'
 
     def get_queryset(self):
         self.category = get_object_or_404(
@@ -108,11 +141,12 @@ class CategoryListView(ListView):
             slug=self.kwargs['category_slug'],
             is_published=True,
         )
-        return (
-            Post.objects.get_published()
-            .filter(category=self.category)
-            .order_by('-pub_date')
-        )
+        return Post.objects.get_published().in_category(
+            self.category
+        ).for_feed()
+
+    def get_count_cache_key(self):
+        return ('category', self.category.pk)
 
 
 class CommentCreateView(LoginRequiredMixin, AuthorMixin, CreateView):
@@ -120,11 +154,17 @@ class CommentCreateView(LoginRequiredMixin, AuthorMixin, CreateView):
     form_class = CommentForm
 
     def form_valid(self, form):
-        form.instance.post = get_object_or_404(
-            Post,
-            pk=self.kwargs.get('post_id')
-        )
-        return super().form_valid(form)
+        post_id = self.kwargs.get('post_id')
+        form.instance.post_id = post_id
+        # Проверка публикации, комментарий, счётчик и сброс кэшей
+        # (сигналы) — в одной транзакции. Строка публикации блокируется:
+        # её не снимут с публикации и не удалят до коммита.
+        with transaction.atomic():
+            if not Post.objects.visible_to(self.request.user).lock(post_id):
+                raise Http404
+            response = super().form_valid(form)
+            Post.objects.filter(pk=post_id).change_comment_count(1)
+        return response
 
     def get_success_url(self):
         return reverse(
@@ -133,6 +173,34 @@ class CommentCreateView(LoginRequiredMixin, AuthorMixin, CreateView):
         )
 
 
+class CommentListView(CommentPaginationMixin, View):
+    """Следующие страницы комментариев: HTML-фрагмент или JSON."""
+
+    def get(self, request, post_id):
+        if not Post.objects.visible_to(
+            request.user
+        ).filter(pk=post_id).exists():
+            raise Http404
+        comments = self.get_comments_page(post_id, request.GET.get('cursor'))
+        if request.GET.get('format') == 'json':
+            return JsonResponse({
+                'comments': [
+                    {
+                        'id': comment.pk,
+                        'author': comment.author.username,
+                        'text': comment.text,
+                        'created_at': comment.created_at,
+                    }
+                    for comment in comments
+                ],
+                'next_cursor': comments.next_cursor,
+            })
+        return render(request, 'includes/comment_list.html', {
+            'comments': comments,
+            'post_id': post_id,
+        })
+
+
 class CommentUpdateView(
     LoginRequiredMixin, CommentAuthorAccessMixin, CommentMixin, UpdateView
 ):
@@ -147,20 +215,63 @@ class CommentDeleteView(
 ):
     template_name = 'blog/comment_form.html'
 
-
-class UserDetailView(ListView):
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        success_url = self.get_success_url()
+        with transaction.atomic():
+            Post.objects.lock(self.object.post_id)
+            # Параллельный запрос мог уже удалить комментарий: тогда
+            # счётчик уменьшать нельзя.
+            deleted, _ = Comment.objects.filter(pk=self.object.pk).delete()
+            if deleted:
+                Post.objects.filter(
+                    pk=self.object.post_id
+                ).change_comment_count(-1)
+        return HttpResponseRedirect(success_url)
+
+
+class UserDetailView(
+    AnonymousPageCacheMixin,
+    PostCardCacheMixin,
+    FeedPaginationMixin,
+    ListView,
+):
     model = User
     template_name = 'blog/profile.html'
     paginate_by = POSTS_AMOUNT
+    page_cache_namespace = 'profile:{username}'
+
+    # В общий кэш попадают только поля страницы профиля, без пароля,
+    # почты и прав пользователя.
+    profile_fields = (
+        'id', 'username', 'first_name', 'last_name', 'date_joined',
+        'is_staff',
+    )
 
     def get_queryset(self):
-        self.author = get_object_or_404(
-            User,
-            username=self.kwargs['username']
+        username = self.kwargs['username']
+        profile = get_or_set(
+            'profile',
+            [username],
+            lambda: User.objects.filter(username=username).values(
+                *self.profile_fields
+            ).first(),
+            PROFILE_CACHE_TIMEOUT,
         )
+        if profile is None:
+            raise Http404
+        self.author = User(**profile)
+        self.author._state.adding = False
         return Post.objects.get_published(
             user=self.request.user
-        ).filter(author=self.author).order_by('-pub_date')
+        ).by_author(self.author).for_feed()
+
+    def get_count_cache_key(self):
+        return (
+            'profile',
+            self.author.pk,
+            self.request.user.pk == self.author.pk,
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -1,3 +1,24 @@
 TITLE_MAX_LENGTH: int = 256
 TITLE_SHORT: int = 40
 POSTS_AMOUNT: int = 10
+COMMENTS_AMOUNT: int = 50
+FEED_COUNT_CACHE_TIMEOUT: int = 60
+PAGE_RANGE_ON_EACH_SIDE: int = 2
+PAGE_RANGE_ON_ENDS: int = 1
+POST_CARD_CACHE_TIMEOUT: int = 60 * 60
+CACHE_LOCK_TIMEOUT: int = 10
+CACHE_LOCK_WAIT: float = 2.0
+POST_CACHE_TIMEOUT: int = 5 * 60
+PROFILE_CACHE_TIMEOUT: int = 5 * 60
+PAGE_CACHE_TIMEOUT: int = 5 * 60
+SCHEDULER_RECHECK_TIMEOUT: int = 60
+EXCERPT_WORDS: int = 10
+EXCERPT_MAX_LENGTH: int = 512
+IMAGE_DERIVATIVE_WIDTHS: dict = {'card': 640, 'detail': 1280}
+IMAGE_JPEG_QUALITY: int = 82
+IMAGE_WEBP_QUALITY: int = 80
+IMAGE_JOB_MAX_ATTEMPTS: int = 3
+IMAGE_JOB_RETRY_DELAY: int = 60
+IMAGE_JOB_TIMEOUT: int = 10 * 60
+FILE_CACHE_MAX_AGE: int = 60 * 60
+IMMUTABLE_CACHE_MAX_AGE: int = 365 * 24 * 60 * 60
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 
@@ -26,6 +27,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -57,6 +59,36 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv(
+            'BLOGICUM_CACHE_LOCATION', BASE_DIR / 'django_cache'
+        ),
+    },
+    'redis': {
+        'BACKEND': 'core.cache_backends.RedisCache',
+        'LOCATION': os.getenv(
+            'BLOGICUM_CACHE_LOCATION', 'redis://127.0.0.1:6379/0'
+        ),
+        'OPTIONS': {'SOCKET_TIMEOUT': 1},
+    },
+}
+
+# Бэкенд кэша выбирается переменной окружения: locmem, file или redis.
+CACHES = {
+    'default': {
+        **CACHE_BACKENDS[os.getenv('BLOGICUM_CACHE_BACKEND', 'locmem')],
+        'KEY_PREFIX': 'blogicum',
+    },
+}
+
+BLOG_CACHE_ALIAS = 'default'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
@@ -89,12 +121,16 @@ USE_L10N = True
 
 USE_TZ = True
 
-STATIC_ROOT = ''
+STATIC_ROOT = BASE_DIR / 'static_collected'
 
 STATIC_URL = '/static/'
 
 STATICFILES_DIRS = ['static']
 
+# Имена собранной статики содержат хеш содержимого (style.3f2a9c1b7e4d.css),
+# поэтому такие файлы отдаются с Cache-Control: immutable.
+STATICFILES_STORAGE = 'core.storage.ManifestStaticStorage'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
@@ -108,3 +144,56 @@ LOGIN_REDIRECT_URL = 'blog:index'
 LOGIN_URL = 'login'
 
 MEDIA_ROOT = BASE_DIR / 'media'
+
+MEDIA_URL = '/media/'
+
+# Отдачу файлов из MEDIA_ROOT и STATIC_ROOT можно переложить на прокси:
+# 'X-Accel-Redirect' (nginx) или 'X-Sendfile' (Apache, lighttpd).
+# Для nginx адрес файла передаётся с префиксом FILE_ACCEL_REDIRECT_PREFIX,
+# который должен вести на internal location с тем же каталогом.
+FILE_SENDFILE_HEADER = os.getenv('BLOGICUM_FILE_SENDFILE_HEADER') or None
+
+FILE_ACCEL_REDIRECT_PREFIX = '/internal'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'blogicum.performance': {
+            'handlers': ['console'],
+            'level': os.getenv('BLOGICUM_PERFORMANCE_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Бюджеты представлений: queries, db_ms, template_ms, total_ms,
+# response_bytes. В строгом режиме превышение вызывает исключение.
+VIEW_PERFORMANCE_BUDGETS = {
+    'blog:index': {'queries': 6},
+    'blog:category_posts': {'queries': 7},
+    'blog:profile': {'queries': 7},
+    'blog:post_detail': {'queries': 6},
+    'blog:create_post': {'queries': 4},
+    'blog:edit_post': {'queries': 8},
+    'blog:delete_post': {'queries': 8},
+    'blog:comments': {'queries': 4},
+    'blog:add_comment': {'queries': 12},
+    'blog:edit_comment': {'queries': 6},
+    'blog:delete_comment': {'queries': 12},
+    'blog:edit_profile': {'queries': 4},
+}
+
+VIEW_PERFORMANCE_BUDGETS_STRICT = False
+
+# Keyset-пагинация лент по умолчанию (без ?cursor= в адресе).
+BLOG_CURSOR_PAGINATION = False
+
+# Начиная с какой оценки планировщика (PostgreSQL) не считать COUNT(*)
+# в пагинаторе лент; None — всегда точный подсчёт.
+BLOG_COUNT_ESTIMATE_THRESHOLD = 100_000
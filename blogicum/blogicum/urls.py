@@ -1,7 +1,10 @@
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from core.views import serve_file
 
 # Подключаем маршруты для работы с пользователями из django.contrib.auth.urls
 urlpatterns = [
@@ -16,4 +19,15 @@ urlpatterns = [
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Фото публикаций и собранная статика, если перед приложением нет
+# отдельного веб-сервера (в режиме DEBUG статику отдаёт runserver).
+for prefix, root_setting in (
+    (settings.MEDIA_URL, 'MEDIA_ROOT'),
+    (settings.STATIC_URL, 'STATIC_ROOT'),
+):
+    if prefix.startswith('/') and not prefix.startswith('//'):
+        urlpatterns.append(re_path(
+            rf'^{re.escape(prefix.lstrip("/"))}(?P<path>.+)$',
+            serve_file,
+            {'root_setting': root_setting},
+        ))
@@ -0,0 +1,243 @@
+import pickle
+import socket
+import threading
+from urllib.parse import unquote, urlparse
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisConnection:
+    """Минимальный клиент протокола RESP поверх сокета."""
+
+    def __init__(self, host, port, db=0, password=None, timeout=None):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.file = self.sock.makefile('rb')
+        if password:
+            self.execute('AUTH', password)
+        if db:
+            self.execute('SELECT', db)
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    @staticmethod
+    def pack(*args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def read_reply(self):
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError('Redis закрыл соединение.')
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode()
+        if kind == b'-':
+            raise RedisError(payload.decode())
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self.file.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self.read_reply() for _ in range(length)]
+        raise RedisError(f'Неизвестный ответ Redis: {line!r}')
+
+    def execute(self, *args):
+        self.sock.sendall(self.pack(*args))
+        return self.read_reply()
+
+    def pipeline(self, commands):
+        self.sock.sendall(b''.join(self.pack(*args) for args in commands))
+        return [self.read_reply() for _ in commands]
+
+
+class RedisCache(BaseCache):
+    """Бэкенд кэша Django для серверов с протоколом Redis.
+
+    LOCATION задаётся URL вида redis://[:password@]host:port/db.
+    Целые числа хранятся как есть, чтобы incr() выполнялся атомарно
+    командой INCRBY, остальные значения сериализуются pickle.
+    """
+
+    # Проверка ключа и INCRBY в одном скрипте: между ними ключ
+    # не может истечь или быть удалён другим клиентом.
+    INCR_SCRIPT = (
+        "if redis.call('EXISTS', KEYS[1]) == 0 then return false end "
+        "return redis.call('INCRBY', KEYS[1], ARGV[1])"
+    )
+    # После разрыва соединения неизвестно, выполнил ли сервер команду,
+    # поэтому повторяются только чтения.
+    RETRY_COMMANDS = frozenset({'GET', 'MGET', 'EXISTS'})
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        url = urlparse(server if '://' in server else f'redis://{server}')
+        self._host = url.hostname or '127.0.0.1'
+        self._port = url.port or 6379
+        self._db = int(url.path.lstrip('/') or 0)
+        self._password = unquote(url.password) if url.password else None
+        self._socket_timeout = params.get('OPTIONS', {}).get(
+            'SOCKET_TIMEOUT'
+        )
+        self._local = threading.local()
+
+    @property
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = RedisConnection(
+                self._host,
+                self._port,
+                db=self._db,
+                password=self._password,
+                timeout=self._socket_timeout,
+            )
+            self._local.client = client
+        return client
+
+    def _execute(self, *args):
+        try:
+            return self._client.execute(*args)
+        except (ConnectionError, OSError):
+            self.close()
+            if args[0] not in self.RETRY_COMMANDS:
+                raise
+            return self._client.execute(*args)
+
+    def _pipeline(self, commands):
+        try:
+            return self._client.pipeline(commands)
+        except (ConnectionError, OSError):
+            self.close()
+            raise
+
+    @staticmethod
+    def _encode(value):
+        if type(value) is int:
+            return str(value).encode()
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(data):
+        if data is None:
+            return None
+        try:
+            return int(data)
+        except ValueError:
+            return pickle.loads(data)
+
+    def _expiry_args(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return []
+        return ['PX', max(int(timeout * 1000), 1)]
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        if timeout == 0:
+            return not self._execute('EXISTS', key)
+        return self._execute(
+            'SET', key, self._encode(value), 'NX',
+            *self._expiry_args(timeout),
+        ) is not None
+
+    def get(self, key, default=None, version=None):
+        value = self._decode(self._execute('GET', self._key(key, version)))
+        return default if value is None else value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        if timeout == 0:
+            self._execute('DEL', key)
+            return
+        self._execute(
+            'SET', key, self._encode(value), *self._expiry_args(timeout)
+        )
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        expiry = self._expiry_args(timeout)
+        if not expiry:
+            return bool(self._execute('PERSIST', key)) or bool(
+                self._execute('EXISTS', key)
+            )
+        return bool(self._execute('PEXPIRE', key, expiry[1]))
+
+    def delete(self, key, version=None):
+        return bool(self._execute('DEL', self._key(key, version)))
+
+    def has_key(self, key, version=None):
+        return bool(self._execute('EXISTS', self._key(key, version)))
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        try:
+            value = self._execute('EVAL', self.INCR_SCRIPT, 1, key, delta)
+        except RedisError as error:
+            raise ValueError(str(error))
+        if value is None:
+            raise ValueError(f"Key '{key}' not found")
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self._execute(
+            'MGET', *(self._key(key, version) for key in keys)
+        )
+        return {
+            key: self._decode(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        if timeout == 0:
+            self.delete_many(data, version=version)
+            return []
+        expiry = self._expiry_args(timeout)
+        self._pipeline([
+            ('SET', self._key(key, version), self._encode(value), *expiry)
+            for key, value in data.items()
+        ])
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self._execute('DEL', *keys)
+
+    def clear(self):
+        self._execute('FLUSHDB')
+
+    def close(self, **kwargs):
+        client = getattr(self._local, 'client', None)
+        if client is not None:
+            self._local.client = None
+            try:
+                client.close()
+            except OSError:
+                pass
@@ -0,0 +1,123 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('blogicum.performance')
+
+
+class ViewBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.view_name = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.total_time = 0.0
+        self.response_size = None
+        self._template_started = None
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+    def template_started(self):
+        self._template_started = time.perf_counter()
+
+    def template_finished(self, response):
+        if self._template_started is not None:
+            self.template_time = time.perf_counter() - self._template_started
+
+    def as_dict(self):
+        return {
+            'view': self.view_name,
+            'queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 2),
+            'template_ms': round(self.template_time * 1000, 2),
+            'total_ms': round(self.total_time * 1000, 2),
+            'response_bytes': self.response_size,
+        }
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_time * 1000:.2f}',
+            f'total;dur={self.total_time * 1000:.2f}',
+        ])
+
+    def budget_violations(self, budget):
+        measured = self.as_dict()
+        return [
+            f'{name}={measured[name]} > {limit}'
+            for name, limit in budget.items()
+            if measured.get(name) is not None and measured[name] > limit
+        ]
+
+
+class PerformanceMiddleware:
+    """Считает запросы к БД и время ответа для каждого представления.
+
+    Метрики уходят в заголовок Server-Timing и в лог blogicum.performance
+    строкой JSON. Превышение бюджета из VIEW_PERFORMANCE_BUDGETS
+    пишется в лог как предупреждение, а при
+    VIEW_PERFORMANCE_BUDGETS_STRICT = True — прерывает запрос
+    исключением ViewBudgetExceeded (для тестов).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        request.performance_metrics = metrics
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(metrics.record_query)
+                )
+            response = self.get_response(request)
+        metrics.total_time = time.perf_counter() - started
+
+        if request.resolver_match:
+            metrics.view_name = request.resolver_match.view_name
+        if not response.streaming:
+            metrics.response_size = len(response.content)
+        response['Server-Timing'] = metrics.server_timing()
+        logger.info(json.dumps(metrics.as_dict()))
+        self.check_budget(metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        metrics = getattr(request, 'performance_metrics', None)
+        if metrics is not None:
+            metrics.template_started()
+            response.add_post_render_callback(metrics.template_finished)
+        return response
+
+    def check_budget(self, metrics):
+        budgets = getattr(settings, 'VIEW_PERFORMANCE_BUDGETS', {})
+        budget = budgets.get(metrics.view_name)
+        if not budget:
+            return
+        violations = metrics.budget_violations(budget)
+        if not violations:
+            return
+        message = (
+            f'Представление {metrics.view_name} превысило бюджет: '
+            f'{", ".join(violations)}'
+        )
+        if getattr(settings, 'VIEW_PERFORMANCE_BUDGETS_STRICT', False):
+            raise ViewBudgetExceeded(message)
+        logger.warning(message)
@@ -0,0 +1,132 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from blogicum.constants import FILE_CACHE_MAX_AGE, IMMUTABLE_CACHE_MAX_AGE
+
+
+# Имена с хешем содержимого: файлы хранилища фото по SHA-256
+# и статика после ManifestStaticFilesStorage (name.0123456789ab.css).
+HASHED_NAME = re.compile(r'(^|/)[0-9a-f]{64}\.|\.[0-9a-f]{12}\.\w+$')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """Возвращает (start, end) для одного диапазона байтов или None.
+
+    Неподдерживаемый заголовок игнорируется (ответ целиком),
+    недостижимый диапазон даёт ValueError.
+    """
+    match = RANGE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    else:
+        start, end = max(size - int(end), 0), size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_file(request, path, root_setting):
+    """Отдаёт файл с ETag, Last-Modified, Cache-Control и Range.
+
+    Файлы с хешем в имени помечаются immutable. Целиком файл уходит
+    через FileResponse, то есть через wsgi.file_wrapper (sendfile
+    у gunicorn и uWSGI). Если задан FILE_SENDFILE_HEADER, сам файл
+    отдаёт прокси-сервер по заголовку X-Accel-Redirect или X-Sendfile.
+    Каталог берётся из настройки root_setting в момент запроса.
+    """
+    try:
+        full_path = safe_join(
+            os.fspath(getattr(settings, root_setting)), path
+        )
+        stat = os.stat(full_path)
+    except (OSError, ValueError, SuspiciousFileOperation):
+        # Путь вне каталога (../) отвечает так же, как отсутствующий файл.
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        response = build_file_response(request, full_path, stat, etag)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    if HASHED_NAME.search(path):
+        response['Cache-Control'] = (
+            f'public, max-age={IMMUTABLE_CACHE_MAX_AGE}, immutable'
+        )
+    else:
+        response['Cache-Control'] = f'public, max-age={FILE_CACHE_MAX_AGE}'
+    return response
+
+
+def build_file_response(request, full_path, stat, etag):
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    sendfile_header = settings.FILE_SENDFILE_HEADER
+    if sendfile_header:
+        response = HttpResponse(content_type=content_type)
+        response[sendfile_header] = (
+            settings.FILE_ACCEL_REDIRECT_PREFIX + request.path
+            if sendfile_header == 'X-Accel-Redirect' else full_path
+        )
+        return response
+
+    byte_range = None
+    if request.headers.get('Range') and request.headers.get(
+        'If-Range', etag
+    ) == etag:
+        try:
+            byte_range = parse_range(request.headers['Range'], stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+    if byte_range is None:
+        response = FileResponse(
+            open(full_path, 'rb'), content_type=content_type
+        )
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(full_path, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    return response
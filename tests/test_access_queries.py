@@ -0,0 +1,145 @@
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def table_queries(client, url, table):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    return response, [
+        q["sql"] for q in ctx.captured_queries
+        if f'FROM "{table}"' in q["sql"]
+    ]
+
+
+@pytest.mark.parametrize("action", ["edit", "delete"])
+def test_post_access_check_reuses_object(
+        action, user_client, another_user_client,
+        post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/{action}/"
+    response, post_queries = table_queries(user_client, url, "blog_post")
+    assert response.status_code == 200
+    assert len(post_queries) == 1, (
+        "Убедитесь, что проверка авторства не загружает публикацию"
+        " повторно."
+    )
+    _, user_queries = table_queries(user_client, url, "auth_user")
+    assert len(user_queries) == 1, (
+        "Убедитесь, что для проверки авторства не загружается автор"
+        " публикации."
+    )
+
+    response, post_queries = table_queries(
+        another_user_client, url, "blog_post"
+    )
+    assert response.status_code == 302
+    assert len(post_queries) == 1
+
+
+@pytest.mark.parametrize("action", ["edit_comment", "delete_comment"])
+def test_comment_access_check_reuses_object(action, comment_to_a_post):
+    client = Client()
+    client.force_login(comment_to_a_post.author)
+    url = (
+        f"/posts/{comment_to_a_post.post_id}/{action}/"
+        f"{comment_to_a_post.id}/"
+    )
+    response, comment_queries = table_queries(client, url, "blog_comment")
+    assert response.status_code == 200
+    assert len(comment_queries) == 1, (
+        "Убедитесь, что проверка авторства не загружает комментарий"
+        " повторно."
+    )
+    _, user_queries = table_queries(client, url, "auth_user")
+    assert len(user_queries) == 1, (
+        "Убедитесь, что для проверки авторства не загружается автор"
+        " комментария."
+    )
+
+
+@pytest.mark.parametrize("action", ["edit_comment", "delete_comment"])
+def test_comment_lookup_is_scoped_to_post(
+        action, mixer, comment_to_a_post, published_category,
+        published_location
+):
+    other_post = mixer.blend(
+        "blog.Post", category=published_category, location=published_location
+    )
+    client = Client()
+    client.force_login(comment_to_a_post.author)
+    url = f"/posts/{other_post.id}/{action}/{comment_to_a_post.id}/"
+    response, comment_queries = table_queries(client, url, "blog_comment")
+    assert response.status_code == 404, (
+        "Убедитесь, что комментарий ищется только среди комментариев"
+        " публикации из адреса страницы."
+    )
+    assert len(comment_queries) == 1
+    assert client.post(url).status_code == 404
+    assert type(comment_to_a_post).objects.filter(
+        pk=comment_to_a_post.pk
+    ).exists()
+
+
+def test_add_comment_checks_post_without_loading_it(
+        mixer, user_client, another_user_client, post_with_published_location,
+        published_category, published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/comment/"
+    with CaptureQueriesContext(connection) as ctx:
+        response = another_user_client.post(url, {"text": "Комментарий"})
+    assert response.status_code == 302
+    assert not any(
+        '"blog_post"."text"' in q["sql"] for q in ctx.captured_queries
+    ), (
+        "Убедитесь, что при добавлении комментария публикация не"
+        " загружается целиком."
+    )
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+    hidden = mixer.blend(
+        "blog.Post", is_published=False, author=post.author,
+        category=published_category, location=published_location,
+    )
+    url = f"/posts/{hidden.id}/comment/"
+    assert another_user_client.post(
+        url, {"text": "Комментарий"}
+    ).status_code == 404, (
+        "Убедитесь, что нельзя прокомментировать скрытую публикацию."
+    )
+    assert user_client.post(url, {"text": "Комментарий"}).status_code == 302
+
+
+def test_comment_count_changes_in_one_transaction_with_check(
+        another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    with CaptureQueriesContext(connection) as ctx:
+        another_user_client.post(
+            f"/posts/{post.id}/comment/", {"text": "Комментарий"}
+        )
+    sql = [q["sql"] for q in ctx.captured_queries]
+    savepoint = next(
+        i for i, q in enumerate(sql) if q.startswith("SAVEPOINT")
+    )
+    check = next(
+        i for i, q in enumerate(sql)
+        if q.startswith('SELECT "blog_post"."id" FROM "blog_post"')
+    )
+    assert savepoint < check, (
+        "Убедитесь, что проверка публикации выполняется в транзакции"
+        " вместе с изменением счётчика комментариев."
+    )
+
+    comment = post.comments.get()
+    response = another_user_client.post(
+        f"/posts/{post.id}/delete_comment/{comment.id}/"
+    )
+    assert response.status_code == 302
+    post.refresh_from_db()
+    assert post.comment_count == 0
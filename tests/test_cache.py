@@ -0,0 +1,232 @@
+import socketserver
+import threading
+import time
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import override_settings
+
+from blog import cache as blog_cache
+from core.cache_backends import RedisCache
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Заглушка сервера Redis: подмножество команд без сохранения на диск."""
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def reply(self, value):
+        if value is None:
+            self.wfile.write(b"$-1\r\n")
+        elif isinstance(value, bool):
+            self.wfile.write(b":%d\r\n" % value)
+        elif isinstance(value, int):
+            self.wfile.write(b":%d\r\n" % value)
+        elif isinstance(value, str):
+            self.wfile.write(b"+%s\r\n" % value.encode())
+        elif isinstance(value, list):
+            self.wfile.write(b"*%d\r\n" % len(value))
+            for item in value:
+                self.reply(item)
+        else:
+            self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            command, args = args[0].decode().upper(), args[1:]
+            with self.server.lock:
+                now = time.monotonic()
+                for key, (_, expires) in list(store.items()):
+                    if expires is not None and expires <= now:
+                        del store[key]
+                result = self.execute(store, command, args, now)
+                if self.server.drop_after == command:
+                    # Команда выполнена, но ответ клиенту не дошёл.
+                    self.server.drop_after = None
+                    return
+                self.reply(result)
+
+    def execute(self, store, command, args, now):
+        if command == "SET":
+            key, value, options = args[0], args[1], args[2:]
+            flags = [option.upper() for option in options]
+            if b"NX" in flags and key in store:
+                return None
+            expires = None
+            if b"PX" in flags:
+                px = int(options[flags.index(b"PX") + 1])
+                expires = now + px / 1000
+            store[key] = (value, expires)
+            return "OK"
+        if command == "GET":
+            return store.get(args[0], (None, None))[0]
+        if command == "MGET":
+            return [store.get(key, (None, None))[0] for key in args]
+        if command == "DEL":
+            return sum(store.pop(key, None) is not None for key in args)
+        if command == "EXISTS":
+            return sum(key in store for key in args)
+        if command == "EVAL" and args[0] == RedisCache.INCR_SCRIPT.encode():
+            if args[2] not in store:
+                return None
+            command, args = "INCRBY", args[2:]
+        if command == "INCRBY":
+            value, expires = store.get(args[0], (b"0", None))
+            value = int(value) + int(args[1])
+            store[args[0]] = (str(value).encode(), expires)
+            return value
+        if command == "PEXPIRE":
+            if args[0] not in store:
+                return 0
+            store[args[0]] = (store[args[0]][0], now + int(args[1]) / 1000)
+            return 1
+        if command == "PERSIST":
+            if args[0] not in store or store[args[0]][1] is None:
+                return 0
+            store[args[0]] = (store[args[0]][0], None)
+            return 1
+        if command == "FLUSHDB":
+            store.clear()
+            return "OK"
+        return "OK"
+
+
+@pytest.fixture
+def redis_cache():
+    server = socketserver.ThreadingTCPServer(
+        ("127.0.0.1", 0), FakeRedisHandler
+    )
+    server.daemon_threads = True
+    server.store = {}
+    server.lock = threading.Lock()
+    server.drop_after = None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    cache = RedisCache(f"redis://{host}:{port}/0", {"KEY_PREFIX": "test"})
+    cache.server = server
+    yield cache
+    cache.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_redis_cache_basic_operations(redis_cache):
+    redis_cache.set("post", {"title": "Заголовок"})
+    assert redis_cache.get("post") == {"title": "Заголовок"}
+    assert redis_cache.get("missing", "default") == "default"
+
+    assert redis_cache.add("post", "other") is False
+    assert redis_cache.add("new", 1) is True
+
+    redis_cache.set("counter", 1)
+    assert redis_cache.incr("counter", 5) == 6
+    with pytest.raises(ValueError):
+        redis_cache.incr("missing")
+
+    redis_cache.set_many({"a": 1, "b": [2]})
+    assert redis_cache.get_many(["a", "b", "c"]) == {"a": 1, "b": [2]}
+
+    redis_cache.delete_many(["a", "b"])
+    assert not redis_cache.has_key("a")
+    assert redis_cache.delete("post") is True
+
+    redis_cache.clear()
+    assert redis_cache.get("counter") is None
+
+
+def test_redis_cache_retries_only_reads(redis_cache):
+    redis_cache.set("counter", 1)
+    redis_cache.server.drop_after = "EVAL"
+    with pytest.raises(ConnectionError):
+        redis_cache.incr("counter")
+    assert redis_cache.get("counter") == 2, (
+        "Убедитесь, что incr() не повторяется после разрыва соединения."
+    )
+
+    redis_cache.server.drop_after = "GET"
+    assert redis_cache.get("counter") == 2
+
+
+def test_redis_cache_expiry(redis_cache):
+    redis_cache.set("short", "value", timeout=0.05)
+    assert redis_cache.get("short") == "value"
+    time.sleep(0.1)
+    assert redis_cache.get("short") is None
+    redis_cache.set("gone", "value", timeout=0)
+    assert redis_cache.get("gone") is None
+
+
+@pytest.fixture
+def locmem_blog_cache():
+    with override_settings(CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "test-blog-cache",
+        }
+    }):
+        yield blog_cache.get_cache()
+
+
+def test_versioned_invalidation(locmem_blog_cache):
+    calls = []
+
+    def producer():
+        calls.append(1)
+        return len(calls)
+
+    assert blog_cache.get_or_set("feed", ["index"], producer, 60) == 1
+    assert blog_cache.get_or_set("feed", ["index"], producer, 60) == 1
+    blog_cache.bump_version("feed")
+    assert blog_cache.get_or_set("feed", ["index"], producer, 60) == 2
+
+
+def test_stampede_single_producer(locmem_blog_cache):
+    assert isinstance(locmem_blog_cache, LocMemCache)
+    calls = []
+    results = []
+
+    def slow_producer():
+        calls.append(1)
+        time.sleep(0.2)
+        return "value"
+
+    threads = [
+        threading.Thread(target=lambda: results.append(
+            blog_cache.get_or_set("slow", ["key"], slow_producer, 60)
+        ))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1, (
+        "Убедитесь, что при промахе кэша значение вычисляет только один"
+        " запрос."
+    )
+
+
+def test_missing_value_is_not_cached(locmem_blog_cache):
+    calls = []
+
+    def producer():
+        calls.append(1)
+
+    blog_cache.get_or_set("profile", ["newbie"], producer, 60)
+    blog_cache.get_or_set("profile", ["newbie"], producer, 60)
+    assert len(calls) == 2
@@ -0,0 +1,63 @@
+import re
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def paginated_comments(mixer, monkeypatch, post_with_published_location):
+    from blog.mixins import CommentPaginationMixin
+
+    monkeypatch.setattr(CommentPaginationMixin, "comments_per_page", 2)
+    return mixer.cycle(5).blend(
+        "blog.Comment",
+        post=post_with_published_location,
+        text=mixer.sequence("Комментарий номер {0}."),
+    )
+
+
+def test_post_detail_shows_first_comment_page(client, paginated_comments):
+    post_id = paginated_comments[0].post_id
+    content = client.get(f"/posts/{post_id}/").content.decode("utf-8")
+    shown = [c.text for c in paginated_comments if c.text in content]
+    assert shown == [c.text for c in paginated_comments[:2]], (
+        "Убедитесь, что на странице публикации выводится только первая"
+        " страница комментариев."
+    )
+    cursor = re.search(r"\?comments=([\w-]+)", content).group(1)
+    content = client.get(
+        f"/posts/{post_id}/?comments={cursor}"
+    ).content.decode("utf-8")
+    assert [c.text for c in paginated_comments if c.text in content] == [
+        c.text for c in paginated_comments[2:4]
+    ]
+
+
+def test_comment_fragment_endpoint(client, paginated_comments):
+    post_id = paginated_comments[0].post_id
+    url = f"/posts/{post_id}/comments/"
+    pages = []
+    cursor = ""
+    while cursor is not None:
+        data = client.get(url, {"cursor": cursor, "format": "json"}).json()
+        pages.append([comment["id"] for comment in data["comments"]])
+        cursor = data["next_cursor"]
+    assert pages == [
+        [c.id for c in paginated_comments[start:start + 2]]
+        for start in (0, 2, 4)
+    ], "Убедитесь, что страницы комментариев идут по порядку без пропусков."
+
+    fragment = client.get(url).content.decode("utf-8")
+    assert paginated_comments[0].text in fragment
+    assert "<html" not in fragment
+    assert client.get(url, {"cursor": "broken"}).status_code == 404
+
+
+def test_comment_endpoint_hides_unpublished_post(
+        client, paginated_comments
+):
+    post = paginated_comments[0].post
+    post.is_published = False
+    post.save()
+    assert client.get(f"/posts/{post.id}/comments/").status_code == 404
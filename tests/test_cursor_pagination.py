@@ -0,0 +1,78 @@
+import base64
+import json
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+CURSOR_RE = re.compile(r'href="\?cursor=([\w-]+)"')
+
+
+@pytest.fixture
+def same_date_posts(mixer: Mixer, user, published_category):
+    # Одинаковая дата проверяет, что курсор учитывает id публикации.
+    pub_date = timezone.now() - timezone.timedelta(days=1)
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=pub_date,
+    )
+
+
+def get_cursors(content):
+    return CURSOR_RE.findall(content)
+
+
+def test_cursor_pages_cover_feed(user_client, same_date_posts):
+    seen = []
+    url = "/?cursor="
+    for _ in range(3):
+        with CaptureQueriesContext(connection) as ctx:
+            response = user_client.get(url)
+        assert response.status_code == 200
+        assert not any(
+            "COUNT(" in q["sql"] for q in ctx.captured_queries
+        ), "Курсорная пагинация не должна выполнять COUNT(*)."
+        seen.extend(post.id for post in response.context["page_obj"])
+        cursors = get_cursors(response.content.decode("utf-8"))
+        next_cursor = response.context["page_obj"].next_cursor
+        if next_cursor is None:
+            break
+        assert next_cursor in cursors
+        url = f"/?cursor={next_cursor}"
+
+    assert sorted(seen) == sorted(post.id for post in same_date_posts)
+    assert len(seen) == len(set(seen))
+
+
+def test_cursor_previous_page(user_client, same_date_posts):
+    first = user_client.get("/?cursor=").context["page_obj"]
+    second = user_client.get(f"/?cursor={first.next_cursor}").context[
+        "page_obj"
+    ]
+    back = user_client.get(f"/?cursor={second.previous_cursor}").context[
+        "page_obj"
+    ]
+    assert [post.id for post in back] == [post.id for post in first]
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [None, ["next", [None, None]], ["next", {"a": 1, "b": 2}],
+     ["next", ["not-a-date", 1]]],
+)
+def test_invalid_cursor(user_client, same_date_posts, payload):
+    cursor = (
+        "not-a-cursor" if payload is None
+        else base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+    )
+    response = user_client.get(f"/?cursor={cursor}")
+    assert response.status_code == 404
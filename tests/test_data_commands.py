@@ -0,0 +1,111 @@
+import csv
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_generate_blog_data(django_user_model):
+    from blog.models import Category, Comment, Location, Post
+
+    call_command(
+        "generate_blog_data", users=5, categories=3, locations=4, posts=40,
+        comments=120, batch_size=7, seed=1, stdout=StringIO(),
+    )
+    assert django_user_model.objects.count() == 5
+    assert Category.objects.count() == 3
+    assert Location.objects.count() == 4
+    assert Post.objects.count() == 40
+    assert Comment.objects.count() == 120
+    drifted = Post.objects.annotate(
+        total=Count("comments")
+    ).exclude(comment_count=F("total"))
+    assert not drifted.exists(), (
+        "Убедитесь, что generate_blog_data заполняет счётчик комментариев."
+    )
+    assert not Post.objects.filter(excerpt="").exists(), (
+        "Убедитесь, что generate_blog_data заполняет анонсы публикаций."
+    )
+
+
+def test_fast_loaddata(tmp_path, django_user_model):
+    from blog.management.commands.fast_loaddata import iter_fixture
+    from blog.models import Comment, Post
+
+    records = [
+        {"model": "blog.comment", "pk": 1, "fields": {
+            "text": "Первый", "post": 1, "author": 7,
+            "created_at": "2022-12-19T10:00:00Z",
+        }},
+        {"model": "blog.comment", "pk": 2, "fields": {
+            "text": "Второй", "post": 1, "author": 7,
+            "created_at": "2022-12-19T11:00:00Z",
+        }},
+        {"model": "blog.post", "pk": 1, "fields": {
+            "title": "Обед", "text": "Обед у В. А. Морозовой.",
+            "pub_date": "1897-02-13T00:00:00Z", "author": 7,
+            "category": 3, "location": None,
+            "created_at": "2022-12-18T23:06:18Z", "is_published": True,
+        }},
+        {"model": "blog.category", "pk": 3, "fields": {
+            "title": "Путешествия", "description": "-", "slug": "travel",
+            "created_at": "2022-12-18T23:00:00Z", "is_published": True,
+        }},
+        {"model": "auth.user", "pk": 7, "fields": {
+            "username": "chekhov", "password": "!", "groups": [],
+            "user_permissions": [],
+        }},
+        {"model": "sessions.session", "pk": "x", "fields": {}},
+    ]
+    fixture = tmp_path / "dump.json"
+    fixture.write_text(
+        json.dumps(records, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    assert list(iter_fixture(str(fixture), chunk_size=16)) == records
+
+    call_command("fast_loaddata", str(fixture), stdout=StringIO())
+    post = Post.objects.get(pk=1)
+    assert post.author == django_user_model.objects.get(username="chekhov")
+    assert post.created_at.isoformat() == "2022-12-18T23:06:18+00:00", (
+        "Убедитесь, что fast_loaddata сохраняет даты из дампа."
+    )
+    assert post.comment_count == Comment.objects.count() == 2
+    assert post.excerpt == "Обед у В. А. Морозовой."
+
+
+@pytest.mark.parametrize("export_format", ["jsonl", "csv"])
+def test_export_blog(tmp_path, export_format, comment_to_a_post):
+    post = comment_to_a_post.post
+    post.image_derivatives = {"card": {"width": 640, "image": "a.jpg"}}
+    post.save(update_fields=["image_derivatives"])
+    call_command(
+        "export_blog", format=export_format, gzip=True, output=str(tmp_path),
+        chunk_size=1, stdout=StringIO(),
+    )
+    with gzip.open(tmp_path / f"posts.{export_format}.gz", "rt") as file:
+        if export_format == "jsonl":
+            rows = [json.loads(line) for line in file]
+        else:
+            rows = list(csv.DictReader(file))
+    assert [row["title"] for row in rows] == [post.title]
+    assert str(rows[0]["author_id"]) == str(post.author_id)
+    derivatives = rows[0]["image_derivatives"]
+    if export_format == "csv":
+        derivatives = json.loads(derivatives)
+    assert derivatives == post.image_derivatives, (
+        "Убедитесь, что поля JSON выгружаются в формате JSON."
+    )
+    assert (tmp_path / f"comments.{export_format}.gz").exists()
+
+    call_command(
+        "export_blog", model="comment", since="2999-01-01",
+        output=str(tmp_path), stdout=StringIO(),
+    )
+    assert (tmp_path / "comments.jsonl").read_text() == "", (
+        "Убедитесь, что --since отбирает записи по дате добавления."
+    )
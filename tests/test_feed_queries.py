@@ -0,0 +1,203 @@
+import importlib
+import re
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts_with_comments(mixer: Mixer, user, published_category):
+    posts = mixer.cycle(N_PER_PAGE).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=None,
+    )
+    for n, post in enumerate(posts):
+        mixer.cycle(n + 1).blend("blog.Comment", post=post, author=user)
+    call_command("recount_comments", stdout=StringIO())
+    return posts
+
+
+@pytest.mark.parametrize("url_template", [
+    "/",
+    "/category/{category_slug}/",
+    "/profile/{username}/",
+])
+def test_feed_comment_count_without_n_plus_one(
+        url_template, user, user_client, published_category,
+        posts_with_comments
+):
+    url = url_template.format(
+        category_slug=published_category.slug, username=user.username
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get(url)
+    assert response.status_code == 200
+    comment_queries = [
+        q["sql"] for q in ctx.captured_queries if "blog_comment" in q["sql"]
+    ]
+    assert len(comment_queries) <= 2, (
+        "Убедитесь, что количество комментариев в ленте не запрашивается"
+        " отдельным запросом для каждой публикации."
+    )
+    content = response.content.decode("utf-8")
+    for n in range(1, N_PER_PAGE + 1):
+        assert f"Комментарии ({n})" in content
+
+
+def test_comment_count_follows_comment_views(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    for text in ("Первый", "Второй"):
+        user_client.post(f"/posts/{post.id}/comment/", data={"text": text})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что при добавлении комментария счётчик комментариев"
+        " публикации увеличивается."
+    )
+
+    comment = post.comments.first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что при удалении комментария счётчик комментариев"
+        " публикации уменьшается."
+    )
+
+
+def test_recount_comments_repairs_drift(mixer: Mixer, posts_with_comments):
+    post = posts_with_comments[-1]
+    post.__class__.objects.filter(pk=post.pk).update(comment_count=0)
+    call_command("recount_comments", batch_size=3, stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == N_PER_PAGE
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [q["sql"] for q in ctx.captured_queries if "COUNT(" in q["sql"]]
+
+
+def test_feed_count_is_cached(
+        mixer: Mixer, user, user_client, published_category,
+        many_posts_with_published_locations
+):
+    assert count_queries(user_client, "/")
+    assert not count_queries(user_client, "/?page=2"), (
+        "Убедитесь, что число публикаций в ленте берётся из кэша."
+    )
+    mixer.blend("blog.Post", author=user, category=published_category)
+    assert count_queries(user_client, "/"), (
+        "Убедитесь, что кэш числа публикаций сбрасывается при изменении"
+        " публикаций."
+    )
+
+
+@pytest.mark.parametrize("url_template", [
+    "/",
+    "/category/{category_slug}/",
+    "/profile/{username}/",
+])
+def test_feed_query_count_does_not_depend_on_page_size(
+        url_template, mixer: Mixer, user, user_client, published_category,
+        published_location
+):
+    url = url_template.format(
+        category_slug=published_category.slug, username=user.username
+    )
+
+    def feed_queries():
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            assert user_client.get(url).status_code == 200
+        return [q["sql"] for q in ctx.captured_queries]
+
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location,
+    )
+    one_post = feed_queries()
+    mixer.cycle(N_PER_PAGE).blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location,
+    )
+    full_page = feed_queries()
+    assert len(full_page) == len(one_post), (
+        "Убедитесь, что автор, категория и местоположение публикаций ленты"
+        " загружаются одним запросом вместе с публикациями."
+    )
+    feed_sql = [sql for sql in full_page if 'FROM "blog_post"' in sql]
+    assert not any(
+        re.search(r'(?<!SUBSTR\()"blog_post"\."text"', sql)
+        for sql in feed_sql
+    ), (
+        "Убедитесь, что лента не загружает полный текст публикаций."
+    )
+
+
+def test_post_excerpt(mixer: Mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    post.text = " ".join(f"слово{n}" for n in range(20))
+    post.save()
+    assert post.excerpt == " ".join(f"слово{n}" for n in range(10)) + " …"
+    assert post.excerpt in user_client.get("/").content.decode("utf-8")
+
+    type(post).objects.filter(pk=post.pk).update(excerpt="")
+    call_command("build_excerpts", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.excerpt.startswith("слово0 ")
+
+
+def test_excerpt_filled_on_raw_save_and_by_migration(
+        user_client, post_with_published_location
+):
+    from django.apps import apps
+    from django.core import serializers
+
+    post = post_with_published_location
+    post.text = "Текст из дампа"
+    post.excerpt = ""
+    # loaddata сохраняет объекты через save_base(raw=True), минуя save().
+    data = serializers.serialize("json", [post])
+    for obj in serializers.deserialize("json", data):
+        obj.save()
+    post.refresh_from_db()
+    assert post.excerpt == "Текст из дампа", (
+        "Убедитесь, что excerpt заполняется и при загрузке дампа."
+    )
+
+    type(post).objects.filter(pk=post.pk).update(excerpt="")
+    migration = importlib.import_module(
+        "blog.migrations.0020_fill_post_excerpts"
+    )
+    migration.fill_excerpts(apps, None)
+    post.refresh_from_db()
+    assert post.excerpt == "Текст из дампа"
+
+
+def test_explain_feeds_lists_every_feed(comment_to_a_post):
+    out = StringIO()
+    call_command("explain_feeds", stdout=out)
+    output = out.getvalue()
+    for feed in (
+        "blog:index",
+        "blog:category_posts",
+        "blog:profile (гость)",
+        "blog:profile (автор)",
+        "blog:post_detail (комментарии)",
+    ):
+        assert feed in output, f"В выводе explain_feeds нет ленты {feed}."
+    assert "blog_post" in output
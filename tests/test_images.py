@@ -0,0 +1,313 @@
+import json
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def upload(name, size=(2000, 1000), color=(73, 109, 137)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color=color).save(buffer, format="JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+def process_image_jobs():
+    call_command(
+        "process_image_jobs", once=True, workers=1, stdout=StringIO()
+    )
+
+
+def post_form_data(published_category, published_location, image):
+    return {
+        "title": "Фото",
+        "text": "Текст",
+        "pub_date": "2020-01-01",
+        "category": published_category.id,
+        "location": published_location.id,
+        "is_published": True,
+        "image": image,
+    }
+
+
+def test_post_form_builds_image_derivatives(
+        media_root, user_client, published_category, published_location,
+        django_capture_on_commit_callbacks
+):
+    from blog.models import Post
+
+    response = user_client.post("/posts/create/", post_form_data(
+        published_category, published_location, upload("photo.jpg")
+    ))
+    assert response.status_code == 302
+    post = Post.objects.get()
+    assert post.image_pending
+    assert post.image_derivatives == {}
+    assert "Фото обрабатывается" in user_client.get("/").content.decode(
+        "utf-8"
+    ), "Убедитесь, что до обработки фото в карточке выводится заглушка."
+
+    process_image_jobs()
+    post.refresh_from_db()
+    assert not post.image_pending
+    derivatives = post.image_derivatives
+    assert derivatives["card"]["width"] == 640
+    assert derivatives["detail"]["width"] == 1280
+    with Image.open(media_root / derivatives["card"]["webp"]) as card:
+        assert card.format == "WEBP"
+        assert card.size == (640, 320)
+    assert (media_root / derivatives["detail"]["image"]).exists()
+
+    content = user_client.get("/").content.decode("utf-8")
+    assert 'type="image/webp"' in content
+    assert f'{derivatives["card"]["image"]} 640w' in content, (
+        "Убедитесь, что карточка публикации использует уменьшенные копии"
+        " изображения в srcset."
+    )
+
+    response = user_client.post(
+        f"/posts/{post.id}/edit/",
+        post_form_data(
+            published_category, published_location,
+            upload("other.jpg", color=(200, 30, 30)),
+        ),
+    )
+    assert response.status_code == 302
+    with django_capture_on_commit_callbacks(execute=True):
+        process_image_jobs()
+    post.refresh_from_db()
+    assert post.image_derivatives["card"] != derivatives["card"]
+    assert not (media_root / derivatives["card"]["webp"]).exists(), (
+        "Убедитесь, что копии прежнего изображения удаляются при замене."
+    )
+
+
+def test_small_image_has_no_derivatives(
+        user_client, published_category, published_location
+):
+    from blog.models import Post
+
+    user_client.post("/posts/create/", post_form_data(
+        published_category, published_location,
+        upload("small.jpg", size=(300, 200)),
+    ))
+    process_image_jobs()
+    post = Post.objects.get()
+    assert post.image_derivatives == {"original": {"width": 300}}
+    assert post.image_variants.card_url == post.image.url
+    assert post.image_variants.srcset == ""
+
+
+def test_image_job_retries_and_fails(
+        monkeypatch, user_client, published_category, published_location
+):
+    from blog import images
+    from blog.models import ImageJob, Post
+
+    def broken(field_file):
+        raise OSError("диск недоступен")
+
+    monkeypatch.setattr(images, "build_derivatives", broken)
+    monkeypatch.setattr("blog.models.build_derivatives", broken)
+    user_client.post("/posts/create/", post_form_data(
+        published_category, published_location, upload("photo.jpg")
+    ))
+    process_image_jobs()
+    job = ImageJob.objects.get()
+    assert job.status == ImageJob.Status.PENDING
+    assert job.attempts == 1
+    assert "диск недоступен" in job.last_error
+
+    for _ in range(2):
+        ImageJob.objects.update(run_after=job.created_at)
+        process_image_jobs()
+    job.refresh_from_db()
+    assert job.status == ImageJob.Status.FAILED, (
+        "Убедитесь, что задание помечается ошибочным после всех попыток."
+    )
+    post = Post.objects.get()
+    assert post.image_status == Post.ImageStatus.FAILED
+    assert "Фото обрабатывается" not in user_client.get("/").content.decode(
+        "utf-8"
+    )
+
+
+def test_identical_uploads_share_one_file(
+        media_root, user_client, published_category, published_location,
+        django_capture_on_commit_callbacks
+):
+    from blog.models import ImageBlob, Post
+
+    for _ in range(2):
+        user_client.post("/posts/create/", post_form_data(
+            published_category, published_location,
+            upload("photo.jpg", size=(300, 200)),
+        ))
+    first, second = Post.objects.order_by("pk")
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые фото хранятся в одном файле."
+    )
+    assert len(first.image.name.split("/")) == 4
+    assert ImageBlob.objects.get(name=first.image.name).ref_count == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user_client.post(f"/posts/{first.id}/delete/")
+    assert (media_root / second.image.name).exists()
+    assert ImageBlob.objects.get(name=second.image.name).ref_count == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user_client.post(f"/posts/{second.id}/delete/")
+    assert not (media_root / second.image.name).exists(), (
+        "Убедитесь, что файл без ссылок удаляется вместе с публикацией."
+    )
+    assert not ImageBlob.objects.exists()
+
+
+def test_cleanup_media_removes_only_orphans(
+        media_root, user_client, published_category, published_location
+):
+    from blog.models import Post
+
+    user_client.post("/posts/create/", post_form_data(
+        published_category, published_location, upload("photo.jpg")
+    ))
+    process_image_jobs()
+    post = Post.objects.get()
+    orphans = [
+        media_root / "birthdays_images" / "old.jpg",
+        media_root / "birthdays_images" / "ab" / "cd" / "abcd.jpg",
+    ]
+    for orphan in orphans:
+        orphan.parent.mkdir(parents=True, exist_ok=True)
+        orphan.write_bytes(b"orphan")
+
+    out = StringIO()
+    call_command("cleanup_media", dry_run=True, min_age=0, stdout=out)
+    assert "лишних: 2" in out.getvalue()
+    assert all(orphan.exists() for orphan in orphans)
+
+    call_command("cleanup_media", min_age=0, workers=2, stdout=StringIO())
+    assert not any(orphan.exists() for orphan in orphans), (
+        "Убедитесь, что cleanup_media удаляет файлы без ссылок."
+    )
+    for name in post.image_names:
+        assert (media_root / name).exists(), (
+            "Убедитесь, что cleanup_media не трогает фото публикаций и"
+            " их копии."
+        )
+
+    call_command("cleanup_media", stdout=StringIO())
+
+
+def shared_image_dump(tmp_path, image):
+    records = [
+        {"model": "auth.user", "pk": 7, "fields": {
+            "username": "chekhov", "password": "!", "groups": [],
+            "user_permissions": [],
+        }},
+    ] + [
+        {"model": "blog.post", "pk": pk, "fields": {
+            "title": f"Пост {pk}", "text": "Текст", "author": 7,
+            "pub_date": "2022-12-18T23:00:00Z", "image": image,
+            "is_published": True,
+        }}
+        for pk in (1, 2)
+    ]
+    fixture = tmp_path / "dump.json"
+    fixture.write_text(json.dumps(records), encoding="utf-8")
+    return fixture
+
+
+def test_fast_loaddata_counts_shared_images(
+        media_root, django_capture_on_commit_callbacks
+):
+    from blog.models import ImageBlob, Post
+
+    image = "birthdays_images/ab/cd/" + "abcd" * 16 + ".jpg"
+    (media_root / image).parent.mkdir(parents=True)
+    (media_root / image).write_bytes(b"photo")
+    call_command(
+        "fast_loaddata", str(shared_image_dump(media_root, image)),
+        stdout=StringIO(),
+    )
+    assert ImageBlob.objects.get(name=image).ref_count == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Post.objects.get(pk=1).delete()
+    assert (media_root / image).exists(), (
+        "Убедитесь, что файл, общий для нескольких публикаций, не удаляется "
+        "вместе с одной из них."
+    )
+
+
+def test_untracked_shared_image_is_kept(
+        media_root, user, django_capture_on_commit_callbacks
+):
+    from blog.models import Post
+
+    image = "birthdays_images/shared.jpg"
+    (media_root / "birthdays_images").mkdir()
+    (media_root / image).write_bytes(b"photo")
+    Post.objects.bulk_create([
+        Post(title=str(pk), text="-", author=user, image=image,
+             pub_date="2022-12-18T23:00:00Z")
+        for pk in range(2)
+    ])
+    first, second = Post.objects.order_by("pk")
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert (media_root / image).exists()
+
+    # Файлы без записи в ImageBlob удаляет только cleanup_media.
+    with django_capture_on_commit_callbacks(execute=True):
+        second.delete()
+    assert (media_root / image).exists()
+    call_command("cleanup_media", min_age=0, stdout=StringIO())
+    assert not (media_root / image).exists()
+
+
+def test_cleanup_media_rechecks_reused_files(
+        media_root, user_client, published_category, published_location,
+        monkeypatch
+):
+    import os
+
+    from blog.management.commands import cleanup_media
+    from blog.models import ImageBlob, Post
+
+    user_client.post("/posts/create/", post_form_data(
+        published_category, published_location, upload("photo.jpg")
+    ))
+    process_image_jobs()
+    post = Post.objects.get()
+    stored = media_root / post.image.name
+    old = stored.stat().st_mtime - 7200
+    os.utime(stored, (old, old))
+    # Публикация потеряла фото: файл стал лишним.
+    Post.objects.update(image="", image_derivatives={})
+    ImageBlob.objects.all().delete()
+    scan_parallel = cleanup_media.scan_parallel
+
+    def scan_then_reupload(*args, **kwargs):
+        # Пока идёт сканирование, то же фото загружают снова.
+        found = scan_parallel(*args, **kwargs)
+        user_client.post("/posts/create/", post_form_data(
+            published_category, published_location, upload("photo.jpg")
+        ))
+        return found
+
+    monkeypatch.setattr(cleanup_media, "scan_parallel", scan_then_reupload)
+    call_command("cleanup_media", workers=1, stdout=StringIO())
+    assert stored.exists(), (
+        "Убедитесь, что cleanup_media не удаляет файл, на который появилась "
+        "ссылка во время сканирования."
+    )
@@ -0,0 +1,88 @@
+import pytest
+from django.templatetags.static import static
+
+pytestmark = [pytest.mark.django_db]
+
+CONTENT = bytes(range(256)) * 4
+HASHED = "birthdays_images/ab/cd/" + "abcd" * 16 + ".jpg"
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    for name in ("plain.jpg", HASHED):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(CONTENT)
+    return tmp_path
+
+
+def test_full_file_with_validators(client):
+    response = client.get("/media/plain.jpg")
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == CONTENT
+    assert response["Content-Type"] == "image/jpeg"
+    assert response["Accept-Ranges"] == "bytes"
+    assert response["ETag"] and response["Last-Modified"]
+    assert "immutable" not in response["Cache-Control"]
+
+
+def test_hashed_name_is_immutable(client):
+    response = client.get(f"/media/{HASHED}")
+    assert response.status_code == 200
+    assert response["Cache-Control"] == (
+        "public, max-age=31536000, immutable"
+    )
+
+
+def test_conditional_request(client):
+    etag = client.get("/media/plain.jpg")["ETag"]
+    response = client.get("/media/plain.jpg", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert not response.content
+
+
+@pytest.mark.parametrize(
+    "header, start, end",
+    [("bytes=10-19", 10, 19), ("bytes=1000-", 1000, 1023),
+     ("bytes=-4", 1020, 1023), ("bytes=1020-5000", 1020, 1023)],
+)
+def test_range_request(client, header, start, end):
+    response = client.get("/media/plain.jpg", HTTP_RANGE=header)
+    assert response.status_code == 206
+    assert b"".join(response.streaming_content) == CONTENT[start:end + 1]
+    assert response["Content-Range"] == f"bytes {start}-{end}/1024"
+    assert int(response["Content-Length"]) == end - start + 1
+
+
+def test_unsatisfiable_range(client):
+    response = client.get("/media/plain.jpg", HTTP_RANGE="bytes=2000-")
+    assert response.status_code == 416
+    assert response["Content-Range"] == "bytes */1024"
+
+
+def test_stale_if_range_returns_full_file(client):
+    response = client.get(
+        "/media/plain.jpg", HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"old"'
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "url", ["/media/missing.jpg", "/media/../settings.py",
+            "/media/%2e%2e/settings.py", "/media/birthdays_images/"],
+)
+def test_missing_and_outside_files(client, url):
+    assert client.get(url).status_code == 404
+
+
+def test_accel_redirect(client, settings):
+    settings.FILE_SENDFILE_HEADER = "X-Accel-Redirect"
+    response = client.get("/media/plain.jpg")
+    assert response.status_code == 200
+    assert response["X-Accel-Redirect"] == "/internal/media/plain.jpg"
+    assert not response.content
+
+
+def test_static_url_without_manifest():
+    assert static("img/fav/favicon.ico") == "/static/img/fav/favicon.ico"
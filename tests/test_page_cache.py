@@ -0,0 +1,211 @@
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.views import PostsListView
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_page_served_from_cache(
+        client, post_with_published_location, django_assert_num_queries
+):
+    first = client.get("/")
+    assert first["X-Page-Cache"] == "miss"
+    with django_assert_num_queries(0):
+        second = client.get("/")
+    assert second["X-Page-Cache"] == "hit"
+    assert second.content == first.content
+
+
+def test_authenticated_page_not_cached(
+        user_client, post_with_published_location
+):
+    user_client.get("/")
+    assert "X-Page-Cache" not in user_client.get("/")
+
+
+def test_page_cache_keyed_on_pagination(
+        client, many_posts_with_published_locations
+):
+    first = client.get("/")
+    second = client.get("/?page=2")
+    assert second["X-Page-Cache"] == "miss"
+    assert first.content != second.content
+
+
+def test_page_cache_invalidation(
+        mixer: Mixer, client, user_client, user, published_category,
+        post_with_published_location, django_capture_on_commit_callbacks
+):
+    post = post_with_published_location
+    urls = [
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    ]
+    for url in urls:
+        client.get(url)
+
+    # Ленты сбрасываются после коммита транзакции с комментарием.
+    with django_capture_on_commit_callbacks(execute=True):
+        user_client.post(
+            f"/posts/{post.id}/comment/", data={"text": "Текст"}
+        )
+    for url in urls:
+        response = client.get(url)
+        assert response["X-Page-Cache"] == "miss", (
+            "Убедитесь, что кэш страницы сбрасывается при добавлении"
+            f" комментария к публикации на странице {url}."
+        )
+        assert "Комментарии (1)" in response.content.decode("utf-8")
+
+    other_post = mixer.blend(
+        "blog.Post", category=published_category, location=post.location
+    )
+    assert other_post.author != user
+    assert client.get(urls[0])["X-Page-Cache"] == "miss"
+    assert client.get(urls[1])["X-Page-Cache"] == "miss"
+    assert client.get(urls[2])["X-Page-Cache"] == "hit", (
+        "Публикация другого автора не должна сбрасывать кэш профиля."
+    )
+
+
+def test_page_cache_timeout_respects_scheduled_posts(
+        rf, mixer: Mixer, published_category
+):
+    view = PostsListView()
+    view.setup(rf.get("/"))
+    mixer.blend(
+        "blog.Post",
+        category=published_category,
+        pub_date=timezone.now() + timezone.timedelta(seconds=30),
+    )
+    assert view.get_page_cache_timeout() <= 31
+
+
+def test_scheduled_post_released_into_cached_feed(
+        monkeypatch, mixer: Mixer, client, published_category,
+        published_location
+):
+    now = timezone.now()
+    post = mixer.blend(
+        "blog.Post",
+        category=published_category,
+        location=published_location,
+        pub_date=now + timezone.timedelta(minutes=1),
+    )
+    assert post.title not in client.get("/").content.decode("utf-8")
+    assert client.get("/")["X-Page-Cache"] == "hit"
+
+    monkeypatch.setattr(
+        timezone, "now", lambda: now + timezone.timedelta(minutes=2)
+    )
+    response = client.get("/")
+    assert response["X-Page-Cache"] == "miss", (
+        "Убедитесь, что кэш ленты сбрасывается, когда наступает время"
+        " отложенной публикации."
+    )
+    assert post.title in response.content.decode("utf-8")
+
+
+def test_profile_of_new_user_is_not_cached_as_missing(
+        client, django_user_model
+):
+    assert client.get("/profile/newbie/").status_code == 404
+    django_user_model.objects.create_user("newbie")
+    assert client.get("/profile/newbie/").status_code == 200, (
+        "Убедитесь, что отсутствие пользователя не кэшируется."
+    )
+
+
+def test_profile_cache_dropped_on_user_delete(client, user):
+    url = f"/profile/{user.username}/"
+    assert client.get(url).status_code == 200
+    user.delete()
+    assert client.get(url).status_code == 404
+
+
+def test_page_cache_namespace(rf):
+    from django.core.exceptions import ImproperlyConfigured
+    from django.urls import resolve
+
+    from blog.mixins import AnonymousPageCacheMixin
+
+    request = rf.get("/category/travel/")
+    view = AnonymousPageCacheMixin()
+    view.request, view.kwargs = request, resolve("/category/travel/").kwargs
+    with pytest.raises(ImproperlyConfigured):
+        view.get_page_cache_namespace()
+
+    view.page_cache_namespace = "category:{category_slug}"
+    assert view.get_page_cache_namespace() == "category:travel"
+
+
+def test_post_delete_queries_do_not_grow_with_comments(
+        mixer: Mixer, user_client, user, published_category,
+        django_capture_on_commit_callbacks
+):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    queries = []
+    for comments in (1, 20):
+        post = mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            location=None,
+        )
+        mixer.cycle(comments).blend("blog.Comment", post=post)
+        with django_capture_on_commit_callbacks(execute=True):
+            with CaptureQueriesContext(connection) as context:
+                user_client.post(f"/posts/{post.id}/delete/")
+        assert not type(post).objects.filter(pk=post.pk).exists()
+        queries.append(len(context))
+    assert queries[0] == queries[1], (
+        "Убедитесь, что число запросов при удалении публикации не растёт "
+        f"с числом комментариев: {queries}."
+    )
+
+
+def test_profile_cache_keeps_no_credentials(client, user):
+    from blog.cache import get_cache, make_key
+
+    assert client.get(f"/profile/{user.username}/").status_code == 200
+    profile, *_ = get_cache().get(make_key("profile", user.username))
+    assert profile["username"] == user.username
+    assert "password" not in profile and "email" not in profile, (
+        "Убедитесь, что в кэш профиля не попадают пароль и почта."
+    )
+
+
+def test_user_update_resets_only_own_caches(
+        client, user, post_with_published_location
+):
+    from blog.cache import get_version
+
+    url = f"/profile/{user.username}/"
+    client.get(url)
+    client.get("/")
+    versions = {
+        namespace: get_version(namespace)
+        for namespace in ("post_card", "post", "page", "profile")
+    }
+
+    user.first_name = "Антон"
+    user.save()
+    assert {
+        namespace: get_version(namespace) for namespace in versions
+    } == versions, "Смена имени не должна сбрасывать кэши всего сайта."
+    assert client.get("/")["X-Page-Cache"] == "hit"
+    assert "Антон" in client.get(url).content.decode("utf-8")
+
+    user.email = "new@example.com"
+    user.save()
+    assert client.get(url)["X-Page-Cache"] == "hit"
+
+    user.username = "renamed"
+    user.save()
+    content = client.get("/").content.decode("utf-8")
+    assert "@renamed" in content, (
+        "Убедитесь, что карточки публикаций показывают новое имя автора."
+    )
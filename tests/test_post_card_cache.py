@@ -0,0 +1,55 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_index(client):
+    return client.get("/").content.decode("utf-8")
+
+
+def test_post_card_served_from_cache(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.title in get_index(user_client)
+
+    # update() не отправляет сигналов, поэтому карточка остаётся в кэше.
+    type(post).objects.filter(pk=post.pk).update(title="Изменено без сигнала")
+    assert post.title in get_index(user_client), (
+        "Убедитесь, что карточки публикаций в ленте кэшируются."
+    )
+
+
+@pytest.mark.parametrize("change", ["post", "category", "location"])
+def test_post_card_invalidation(
+        change, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    get_index(user_client)
+
+    if change == "post":
+        post.title = "Новый заголовок"
+        post.save()
+        expected = post.title
+    elif change == "category":
+        post.category.title = "Новая категория"
+        post.category.save()
+        expected = post.category.title
+    else:
+        post.location.name = "Новое место"
+        post.location.save()
+        expected = post.location.name
+
+    assert expected in get_index(user_client), (
+        "Убедитесь, что кэш карточки публикации сбрасывается при изменении"
+        " публикации, её категории и местоположения."
+    )
+
+
+def test_post_card_invalidated_by_comment(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert "Комментарии (0)" in get_index(user_client)
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    assert "Комментарии (1)" in get_index(user_client)
@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, another_user, published_category):
+    hidden_category = mixer.blend("blog.Category", is_published=False)
+    now = timezone.now()
+    posts = {
+        "published": dict(category=published_category),
+        "no_category": dict(category=None),
+        "unpublished": dict(category=published_category, is_published=False),
+        "scheduled": dict(
+            category=published_category, pub_date=now + timedelta(days=1)
+        ),
+        "hidden_category": dict(category=hidden_category),
+    }
+    return {
+        name: mixer.blend(
+            "blog.Post", author=user, location=None,
+            **{"is_published": True, "pub_date": now - timedelta(days=1),
+               **fields},
+        )
+        for name, fields in posts.items()
+    }
+
+
+def names(queryset, feed_posts):
+    ids = set(queryset.values_list("pk", flat=True))
+    return {name for name, post in feed_posts.items() if post.pk in ids}
+
+
+def test_published_includes_posts_without_category(feed_posts):
+    from blog.models import Post
+
+    assert names(Post.objects.published(), feed_posts) == {
+        "published", "no_category"
+    }, (
+        "Убедитесь, что публикации без категории попадают в ленту, а "
+        "снятые с публикации, отложенные и из скрытых категорий — нет."
+    )
+
+
+def test_visible_to(feed_posts, user, another_user):
+    from blog.models import Post
+
+    everything = set(feed_posts)
+    assert names(Post.objects.visible_to(user), feed_posts) == everything
+    assert names(
+        Post.objects.visible_to(another_user), feed_posts
+    ) == {"published", "no_category"}
+    assert names(
+        Post.objects.visible_to(AnonymousUser()), feed_posts
+    ) == {"published", "no_category"}
+    assert names(Post.objects.visible_to(), feed_posts) == {
+        "published", "no_category"
+    }
+
+
+def test_in_category_and_by_author(
+        feed_posts, user, another_user, published_category
+):
+    from blog.models import Post
+
+    assert names(
+        Post.objects.published().in_category(published_category),
+        feed_posts,
+    ) == {"published"}
+    assert names(
+        Post.objects.get_published(user=user).by_author(user), feed_posts
+    ) == set(feed_posts)
+    assert not Post.objects.published().by_author(another_user).exists()
@@ -0,0 +1,76 @@
+import json
+import logging
+
+import pytest
+from django.test import override_settings
+
+from core.middleware import ViewBudgetExceeded
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def enforce_view_budgets():
+    with override_settings(VIEW_PERFORMANCE_BUDGETS_STRICT=True):
+        yield
+
+
+@pytest.fixture
+def view_urls(user, comment_to_a_post, published_category):
+    post = comment_to_a_post.post
+    post.author = user
+    post.save()
+    comment_to_a_post.author = user
+    comment_to_a_post.save()
+    return [
+        "/",
+        "/?page=1",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+        f"/profile/{user.username}/edit/",
+        f"/posts/{post.id}/",
+        f"/posts/{post.id}/comments/",
+        "/posts/create/",
+        f"/posts/{post.id}/edit/",
+        f"/posts/{post.id}/delete/",
+        f"/posts/{post.id}/edit_comment/{comment_to_a_post.id}/",
+        f"/posts/{post.id}/delete_comment/{comment_to_a_post.id}/",
+    ]
+
+
+def test_views_within_budget(
+        enforce_view_budgets, user_client, client, view_urls,
+        many_posts_with_published_locations
+):
+    for http_client in (user_client, client):
+        for url in view_urls:
+            try:
+                http_client.get(url)
+            except ViewBudgetExceeded as error:
+                raise AssertionError(
+                    f"Страница {url} выполняет слишком много запросов к БД:"
+                    f" {error}"
+                )
+
+
+def test_budget_violation_fails(enforce_view_budgets, client):
+    with override_settings(
+        VIEW_PERFORMANCE_BUDGETS={"blog:index": {"queries": 0}}
+    ):
+        with pytest.raises(ViewBudgetExceeded):
+            client.get("/")
+
+
+def test_server_timing_and_log(client, caplog):
+    logger = logging.getLogger("blogicum.performance")
+    logger.addHandler(caplog.handler)
+    try:
+        response = client.get("/")
+    finally:
+        logger.removeHandler(caplog.handler)
+    assert "db;dur=" in response["Server-Timing"]
+    assert "tpl;dur=" in response["Server-Timing"]
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["view"] == "blog:index"
+    assert record["response_bytes"] == len(response.content)
+    assert record["queries"] >= 1